@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# TextAugment: benchmark comparison
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+Compare two benchmark reports written by run.py and flag regressions. Exits with status 1 if any case is slower than
+the threshold.
+
+Usage: ::
+    python benchmarks/compare.py baseline.json benchmark.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    """Index the results of a report by (name, size)"""
+    with open(path) as fp:
+        report = json.load(fp)
+    return {(result['name'], result['size']): result for result in report['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two textaugment benchmark reports")
+    parser.add_argument('baseline', help="Report of the previous release")
+    parser.add_argument('current', help="Report to check")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Allowed relative slowdown of the p50 latency")
+    args = parser.parse_args()
+
+    baseline, current = load(args.baseline), load(args.current)
+    regressions = 0
+    for key in sorted(set(baseline) & set(current), key=str):
+        before = baseline[key]['latency_ms']['p50']
+        after = current[key]['latency_ms']['p50']
+        change = (after - before) / before if before else 0.0
+        memory = current[key]['peak_memory_kb'] - baseline[key]['peak_memory_kb']
+        flag = 'REGRESSION' if change > args.threshold else ''
+        regressions += bool(flag)
+        print("{:<40} {:<10} p50 {:>9.3f} -> {:>9.3f} ms ({:+7.1%})  peak {:+9.1f} KB  {}".format(
+            key[0], key[1], before, after, change, memory, flag))
+    for key in sorted(set(baseline) ^ set(current), key=str):
+        print("{:<40} {:<10} only in {}".format(key[0], key[1], args.baseline if key in baseline else args.current))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
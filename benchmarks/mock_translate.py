@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# TextAugment: mock translation server for benchmarks
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+A local stand-in for the translation endpoint used by TextBlob, so that Translate can be benchmarked without network
+access. Translating to a language appends a marker to the text, translating back removes it.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class MockTranslateHandler(BaseHTTPRequestHandler):
+    """Answer TextBlob translation requests"""
+
+    latency = 0.0
+
+    def do_POST(self):
+        query = parse_qs(urlparse(self.path).query)
+        length = int(self.headers.get('Content-Length', 0))
+        text = parse_qs(self.rfile.read(length).decode('utf-8')).get('q', [''])[0]
+        to_lang = query.get('tl', ['en'])[0]
+        marker = ' [' + to_lang + ']'
+        if ' [' in text:
+            text = text[:text.rindex(' [')]  # Translate back to the source language
+        else:
+            text = text + marker
+        time.sleep(self.latency)
+        body = json.dumps([text]).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def mock_translate(latency=0.0):
+    """Serve translations locally and point TextBlob at the server while the context is active
+
+    :type latency: float
+    :param latency: (optional) Seconds to wait before answering, to simulate the network
+    """
+    from textblob.translate import Translator
+
+    handler = type('Handler', (MockTranslateHandler,), {'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = Translator.url
+    Translator.url = 'http://127.0.0.1:{}/translate_a/t?client=webapp'.format(server.server_address[1])
+    try:
+        yield server
+    finally:
+        Translator.url = url
+        server.shutdown()
+        server.server_close()
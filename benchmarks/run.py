@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# TextAugment: benchmarks
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+Benchmark every augmenter on synthetic inputs from short tweets to long documents. For each case the throughput,
+per-call latency percentiles and peak Python memory are measured and written as JSON.
+
+Usage: ::
+    python benchmarks/run.py --output benchmark.json
+    python benchmarks/run.py --quick --only eda aeda
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from functools import lru_cache, partial
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import textaugment  # noqa: E402
+from textaugment import AEDA, EDA, MIXUP, Translate, Word2vec, Wordnet  # noqa: E402
+
+from mock_translate import mock_translate  # noqa: E402
+
+SIZES = {
+    'tweet': 15,
+    'paragraph': 120,
+    'document': 1500,
+}
+
+WORDS = (
+    "the a an and or but of to in on at for with from by about as into like through after over between out against "
+    "during without before under around among john mary people school town city country house car road river book "
+    "paper letter story news report student teacher doctor worker friend family child man woman day night week year "
+    "time morning evening music game film picture idea problem question answer reason result change way place world "
+    "go going went walk run drive read write speak talk say tell ask give take make buy sell find lose keep love "
+    "like hate want need help start stop open close learn teach play watch see look hear feel think know believe "
+    "good bad big small long short old new young happy sad quick slow early late easy hard great little high low "
+    "quickly slowly often never always sometimes really very quite almost together again here there today tomorrow"
+).split()
+
+
+def sentences(size, count, seed=1):
+    """Generate count synthetic sentences of the given number of words"""
+    rng = random.Random(seed)
+    return [' '.join(rng.choice(WORDS) for _ in range(size)) for _ in range(count)]
+
+
+def measure(fn, inputs, min_time):
+    """Call fn on every input until min_time has passed, recording latencies, then measure peak memory once"""
+    fn(inputs[0])  # Warm up lazy loaders
+    latencies = []
+    start = time.perf_counter()
+    while True:
+        for data in inputs:
+            call_start = time.perf_counter()
+            fn(data)
+            latencies.append(time.perf_counter() - call_start)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+
+    tracemalloc.start()
+    for data in inputs:
+        fn(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'calls': int(latencies.shape[0]),
+        'sentences_per_sec': float(latencies.shape[0] / elapsed),
+        'latency_ms': {
+            'mean': float(latencies.mean()),
+            'p50': float(np.percentile(latencies, 50)),
+            'p90': float(np.percentile(latencies, 90)),
+            'p99': float(np.percentile(latencies, 99)),
+        },
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+@lru_cache(maxsize=None)
+def word2vec_model():
+    """Train a small gensim model on the synthetic vocabulary"""
+    import gensim
+    corpus = [sentence.split() for sentence in sentences(20, 2000, seed=2)]
+    return gensim.models.Word2Vec(corpus, vector_size=32, min_count=1, window=5, seed=1, workers=1)
+
+
+def cases(args):
+    """Yield (group, name, factory) for every benchmark case. Factories return a function taking one sentence, they
+    are called lazily so that a missing resource only skips its own cases."""
+    yield 'eda', 'EDA.synonym_replacement', lambda: partial(EDA(random_state=args.seed).synonym_replacement, n=2)
+    yield 'eda', 'EDA.random_deletion', lambda: partial(EDA(random_state=args.seed).random_deletion, p=0.1)
+    yield 'eda', 'EDA.random_swap', lambda: partial(EDA(random_state=args.seed).random_swap, n=2)
+    yield 'eda', 'EDA.random_insertion', lambda: partial(EDA(random_state=args.seed).random_insertion, n=2)
+
+    yield 'aeda', 'AEDA.punct_insertion', lambda: AEDA(random_state=args.seed).punct_insertion
+    yield 'aeda', 'AEDA.augment_batch', lambda: lambda s, aeda=AEDA(random_state=args.seed): aeda.augment_batch(
+        [s], n_variants=4)
+
+    yield 'wordnet', 'Wordnet.augment', lambda: Wordnet(random_state=args.seed, v=True, n=True).augment
+
+    yield 'word2vec', 'Word2vec.augment', lambda: Word2vec(model=word2vec_model(), random_state=args.seed).augment
+    yield 'word2vec', 'Word2vec.augment(v=True)', lambda: Word2vec(model=word2vec_model(), random_state=args.seed,
+                                                                   v=True).augment
+
+    yield 'translate', 'Translate.augment', lambda: Translate(src='en', to='es').augment
+
+
+def batch_cases(args):
+    """Yield (name, size, results) for AEDA.augment_batch called once with all the inputs of a size, reported in
+    sentences per second to compare with the per-sentence AEDA.punct_insertion case"""
+    aeda = AEDA(random_state=args.seed)
+    for size in args.sizes:
+        inputs = sentences(SIZES[size], args.count, seed=args.seed)
+        results = measure(partial(aeda.augment_batch, n_variants=1), [inputs], args.min_time)
+        results['sentences_per_sec'] *= len(inputs)
+        results.update(words=SIZES[size], batch=len(inputs))
+        yield 'AEDA.augment_batch(all)', size, results
+
+
+def mixup_cases(args):
+    """Yield (name, results) for MIXUP.flow, measured in batches instead of sentences"""
+    rng = np.random.RandomState(args.seed)
+    for name, shape in [('features', (4096, 300)), ('sequences', (1024, 64, 128))]:
+        data = rng.rand(*shape).astype(np.float32)
+        labels = np.eye(8, dtype=np.float32)[rng.randint(0, 8, shape[0])]
+        for options in [dict(), dict(reuse_buffers=True)]:
+            generator, steps = MIXUP(random_state=args.seed).flow(data, labels, batch_size=64, **options)
+            results = measure(lambda _: next(generator), list(range(steps)), args.min_time)
+            results['batches_per_sec'] = results.pop('sentences_per_sec')
+            label = 'MIXUP.flow({})'.format(', '.join([name] + ['{}={}'.format(*o) for o in options.items()]))
+            generator.close()
+            yield label, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark textaugment augmenters")
+    parser.add_argument('--output', default='benchmark.json', help="JSON file to write the results to")
+    parser.add_argument('--only', nargs='*', help="Groups to run: eda aeda wordnet word2vec translate mixup")
+    parser.add_argument('--sizes', nargs='*', default=list(SIZES), choices=list(SIZES), help="Input sizes to run")
+    parser.add_argument('--count', type=int, default=50, help="Number of distinct inputs per size")
+    parser.add_argument('--min-time', type=float, default=1.0, help="Minimum seconds to run each case")
+    parser.add_argument('--latency', type=float, default=0.0, help="Simulated latency of the translation server")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--quick', action='store_true', help="Few inputs and short runs, for smoke testing")
+    args = parser.parse_args()
+    if args.quick:
+        args.count, args.min_time = 5, 0.05
+
+    report = {
+        'textaugment': textaugment.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'args': vars(args),
+        'results': [],
+        'skipped': [],
+    }
+
+    def selected(group):
+        return not args.only or group in args.only
+
+    def record(name, size, results, unit):
+        results.update(name=name, size=size)
+        report['results'].append(results)
+        print("{:<32} {:<10} {:>12.1f}/s  p50 {:>9.3f} ms  p99 {:>9.3f} ms  peak {:>9.1f} KB".format(
+            name, size, results[unit], results['latency_ms']['p50'], results['latency_ms']['p99'],
+            results['peak_memory_kb']))
+
+    def skip(name, size, error):
+        reason = [line.strip() for line in str(error).splitlines() if line.strip(' *')] or [repr(error)]
+        report['skipped'].append({'name': name, 'size': size, 'reason': reason[0]})
+        print("{:<32} {:<10} skipped: {}".format(name, size or "-", reason[0][:80]))
+
+    with mock_translate(latency=args.latency):
+        for group, name, factory in cases(args):
+            if not selected(group):
+                continue
+            try:
+                fn = factory()
+            except Exception as e:  # Missing resources are reported, not fatal
+                skip(name, None, e)
+                continue
+            for size in args.sizes:
+                inputs = sentences(SIZES[size], args.count, seed=args.seed)
+                try:
+                    results = measure(fn, inputs, args.min_time)
+                except Exception as e:
+                    skip(name, size, e)
+                    continue
+                results['words'] = SIZES[size]
+                record(name, size, results, 'sentences_per_sec')
+
+    if selected('aeda'):
+        for name, size, results in batch_cases(args):
+            record(name, size, results, 'sentences_per_sec')
+
+    if selected('mixup'):
+        for name, results in mixup_cases(args):
+            record(name, 'batch', results, 'batches_per_sec')
+
+    with open(args.output, 'w') as fp:
+        json.dump(report, fp, indent=2)
+    print("Results written to " + args.output)
+
+
+if __name__ == '__main__':
+    main()
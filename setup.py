@@ -43,6 +43,7 @@ setuptools.setup(
       long_description=read("README.md"),
       long_description_content_type="text/markdown",
       install_requires=['nltk', 'gensim>=4.0', 'textblob', 'numpy', 'googletrans>=2'],
+      extras_require={'columnar': ['pyarrow', 'pandas']},
       classifiers=[
           "Intended Audience :: Developers",
           "Natural Language :: English",
@@ -0,0 +1,72 @@
+"""
+Stand-in Wordnet jobs run in subprocesses by the runner and distributed tests.
+"""
+import os
+import subprocess
+import sys
+
+# Defines augment, Wordnet with a lexicon whose synonyms come out of a set, so that their order depends on the hash
+# seed of the process unless they are sorted. It exits after the number of sentences given in argv[3], if not 0.
+WORDNET_AUGMENT = """
+import sys
+import textaugment.wordnet as wordnet
+
+
+class Synset:
+    def lemma_names(self, lang='eng'):
+        return ['town', 'city', 'township', 'borough', 'village', 'burgh', 'municipality', 'metropolis']
+
+
+class Lexicon:
+    VERB, NOUN = 'v', 'n'
+
+    def synsets(self, word, pos=None, lang='eng'):
+        return [Synset()]
+
+    def all_lemma_names(self, pos=None, lang='eng'):
+        return ['town']
+
+    def morphy(self, word, pos=None):
+        return None
+
+
+class Tagger:
+    def tag(self, words):
+        return [(word, 'NN') for word in words]
+
+
+wordnet.wordnet = Lexicon()
+w = wordnet.Wordnet(v=False, n=True, p=0.5)
+w._tagger = Tagger
+calls = []
+
+
+def augment(sentence):
+    calls.append(sentence)
+    if int(sys.argv[3]) and len(calls) > int(sys.argv[3]):
+        sys.exit(3)
+    return w.augment(sentence, top_n=3)
+"""
+
+# Runs the Wordnet job on the corpus argv[1] into the output directory argv[2]
+WORDNET_JOB = WORDNET_AUGMENT + """
+from textaugment.runner import Runner
+
+Runner(augment, sys.argv[2], shard_size=5).run(sys.argv[1])
+"""
+
+# Runs a Wordnet worker on the queue argv[4] into the output directory argv[2]
+WORDNET_WORKER = WORDNET_AUGMENT + """
+from textaugment.runner import Runner
+from textaugment.distributed import FileLeaseQueue, Worker
+
+Worker(Runner(augment, sys.argv[2], shard_size=5), FileLeaseQueue(sys.argv[4]), name=sys.argv[5], poll=0.05).run()
+"""
+
+
+def start_job(script, args, hash_seed):
+    """Start a Python process running script with args and the given hash seed"""
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed))
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         env.get('PYTHONPATH', '')])
+    return subprocess.Popen([sys.executable, "-c", script] + args, env=env, stderr=subprocess.DEVNULL)
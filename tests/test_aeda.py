@@ -0,0 +1,73 @@
+import unittest
+import sys
+from textaugment.aeda import AEDA
+
+
+class InputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = AEDA()
+
+    def test_punct_insertion(self):
+        with self.assertRaises(TypeError, msg="Expect a valid sentence"):
+            self.t.punct_insertion("   ")
+
+        with self.assertRaises(TypeError, msg="Expect integer random_state"):
+            AEDA(random_state="foo")
+
+    def test_punct_insertion_batch(self):
+        with self.assertRaises(TypeError, msg="Expect list of sentences not string"):
+            self.t.punct_insertion_batch("John is going to town")
+
+        with self.assertRaises(TypeError, msg="Expect valid sentences"):
+            self.t.punct_insertion_batch(["John is going to town", ""])
+
+    def test_augment_batch(self):
+        with self.assertRaises(TypeError, msg="Expect positive integer n_variants"):
+            self.t.augment_batch(["John is going to town"], n_variants=0)
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = AEDA()
+        self.data = "John is going to town"
+
+    def strip(self, sentence):
+        return [word for word in sentence.split(' ') if word not in self.t.punctuations]
+
+    def test_punct_insertion(self):
+        augmented = self.t.punct_insertion(self.data)
+        self.assertIsInstance(augmented, str)
+        self.assertEqual(self.strip(augmented), self.data.split(' '), msg="Words keep their order")
+        self.assertGreater(len(augmented.split(' ')), len(self.data.split(' ')))
+        self.assertNotEqual(augmented.split(' ')[-1], ".", msg="Punctuations are inserted before words")
+        self.assertEqual(self.strip(self.t.punct_insertion("town")), ["town"], msg="Short sentences are supported")
+
+    def test_punct_insertion_batch(self):
+        data = [self.data, "town", " ".join(["word"] * 100)]
+        augmented = self.t.punct_insertion_batch(data)
+        self.assertEqual(len(augmented), len(data))
+        for sentence, augmented_sentence in zip(data, augmented):
+            self.assertEqual(self.strip(augmented_sentence), sentence.split(' '))
+            inserted = len(augmented_sentence.split(' ')) - len(sentence.split(' '))
+            self.assertTrue(1 <= inserted <= max(1, len(sentence.split(' ')) // 3))
+        self.assertEqual(self.t.punct_insertion_batch([]), [])
+
+    def test_augment_batch(self):
+        data = [self.data, "town"]
+        augmented = self.t.augment_batch(data, n_variants=3)
+        self.assertEqual([len(variants) for variants in augmented], [3, 3])
+        for sentence, variants in zip(data, augmented):
+            for variant in variants:
+                self.assertEqual(self.strip(variant), sentence.split(' '))
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import asyncio
+import unittest
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from textaugment.aeda import AEDA
+from textaugment.eda import EDA
+
+
+class InputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = EDA(stop_words=[])
+
+    def test_configure_async(self):
+        with self.assertRaises(TypeError, msg="Expect positive max_concurrency"):
+            self.t.configure_async(max_concurrency=0)
+
+    def test_augment_async(self):
+        with self.assertRaises(ValueError, msg="Expect an EDA operation"):
+            asyncio.run(self.t.augment_async("John is going to town", method='foo'))
+
+        with self.assertRaises(TypeError, msg="Expect a list of inputs"):
+            asyncio.run(self.t.augment_batch_async("John is going to town"))
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = EDA(stop_words=[])
+        self.data = "John is going to town"
+
+    def test_augment_async(self):
+        augmented = asyncio.run(self.t.augment_async(self.data, method='random_swap', n=2))
+        self.assertEqual(sorted(augmented.split()), sorted(self.data.split()))
+
+    def test_augment_batch_async(self):
+        running = []
+        peak = []
+
+        def augment(sentence):
+            running.append(1)
+            peak.append(len(running))
+            result = AEDA.punct_insertion(aeda, sentence)
+            running.pop()
+            return result
+
+        aeda = AEDA()
+        aeda._augment_sync = augment
+        with ThreadPoolExecutor(8) as executor:
+            aeda.configure_async(executor=executor, max_concurrency=2)
+            augmented = asyncio.run(aeda.augment_batch_async([self.data] * 20))
+        self.assertEqual(len(augmented), 20)
+        self.assertLessEqual(max(peak), 2, msg="Concurrency is bounded")
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import tempfile
+from textaugment.columnar import Columnar, pa, pq, pd
+from textaugment.dedup import Deduplicator
+
+
+def upper(sentence):
+    return sentence.upper()
+
+
+class Batched:
+    """Augmenter with augment_batch"""
+
+    def augment_batch(self, sentences, n_variants=1):
+        return [[sentence + "!" * (i + 1) for i in range(n_variants)] for sentence in sentences]
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_columnar(self):
+        with self.assertRaises(TypeError, msg="Expect a callable"):
+            Columnar("foo")
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            Columnar(upper, n_variants=0)
+        with self.assertRaises(TypeError, msg="Expect a string"):
+            Columnar(upper, column=1)
+
+    def test_augment_batch(self):
+        with self.assertRaises(TypeError, msg="Expect a RecordBatch, Table or DataFrame"):
+            Columnar(upper).augment_batch(["john is going to town"])
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def test_texts(self):
+        c = Columnar(upper, n_variants=2)
+        self.assertEqual(c.augment_texts(["a b", None, "c"]), [["A B", "A B"], [None, None], ["C", "C"]])
+        c = Columnar(Batched(), n_variants=2)
+        self.assertEqual(c.augment_texts(["a", "", "b"]), [["a!", "a!!"], ["", ""], ["b!", "b!!"]])
+
+    def test_dedup(self):
+        c = Columnar(upper, n_variants=3, dedup=Deduplicator())
+        self.assertEqual(c.augment_texts(["a b", "c"]), [[], []], msg="Variants equal to the source are dropped")
+        self.assertEqual(Columnar._repeat([["A"], [], ["B", "C"]]).tolist(), [0, 2, 2])
+
+    @unittest.skipIf(pd is None, "pandas is not installed")
+    def test_dataframe(self):
+        df = pd.DataFrame({'id': [1, 2, 3], 'text': ["a b", None, "c"], 'label': [0, 1, 0]})
+        chunks = list(Columnar(upper, n_variants=2).augment_batches(df, batch_size=2))
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+        out = pd.concat(chunks)
+        self.assertEqual(out['id'].tolist(), [1, 1, 2, 2, 3, 3])
+        self.assertEqual(out['label'].tolist(), [0, 0, 1, 1, 0, 0])
+        self.assertEqual(out['text'].isna().tolist(), [False, False, True, True, False, False], msg="Nulls are kept")
+        self.assertEqual(out['text'].dropna().tolist(), ["A B", "A B", "C", "C"])
+        self.assertEqual(df['text'].dropna().tolist(), ["a b", "c"], msg="Input is not modified")
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_parquet(self):
+        table = pa.table({'id': list(range(10)), 'text': ["sentence {}".format(i) for i in range(10)]})
+        with tempfile.TemporaryDirectory() as tmp:
+            source, destination = os.path.join(tmp, "in.parquet"), os.path.join(tmp, "out.parquet")
+            pq.write_table(table, source)
+            rows = Columnar(Batched(), n_variants=3).augment_parquet(source, destination, batch_size=4)
+            self.assertEqual(rows, 30)
+            out = pq.read_table(destination)
+            self.assertEqual(out.schema, table.schema)
+            self.assertEqual(out.column('id').to_pylist()[:4], [0, 0, 0, 1])
+            self.assertEqual(out.column('text').to_pylist()[:2], ["sentence 0!", "sentence 0!!"])
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_record_batch(self):
+        batch = pa.RecordBatch.from_pydict({'text': ["a", None], 'label': [1, 0]})
+        out = Columnar(upper).augment_batch(batch)
+        self.assertIsInstance(out, pa.RecordBatch)
+        self.assertEqual(out.column(0).to_pylist(), ["A", None])
+        with self.assertRaises(KeyError, msg="Column must exist"):
+            Columnar(upper, column='sentence').augment_batch(batch)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import tempfile
+from types import SimpleNamespace
+import numpy as np
+import textaugment.dataset
+from textaugment.dataset import AugmentedDataset
+from textaugment.eda import EDA
+from textaugment.mixup import MIXUP
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_dataset(self):
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            AugmentedDataset([], str.upper, buffer_size=0)
+        with self.assertRaises(TypeError, msg="Expect a rank below world_size"):
+            AugmentedDataset([], str.upper, rank=2, world_size=2)
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sentences = ["sentence number {} is going to town".format(i) for i in range(10)]
+        self.t = EDA(stop_words=[])
+        self.get_worker_info = textaugment.dataset.get_worker_info
+
+    def tearDown(self):
+        textaugment.dataset.get_worker_info = self.get_worker_info
+
+    def test_examples(self):
+        data = [(s, i) for i, s in enumerate(self.sentences)]
+        out = list(AugmentedDataset(data, str.upper, n_variants=2, keep_original=True, buffer_size=3))
+        self.assertEqual(len(out), 30)
+        self.assertEqual(out[:3], [data[0], (data[0][0].upper(), 0), (data[0][0].upper(), 0)])
+
+    def test_seed(self):
+        dataset = AugmentedDataset(self.sentences, self.t.random_swap)
+        first = list(dataset)
+        self.assertEqual(list(dataset), first, msg="Same variants in the same epoch")
+        dataset.set_epoch(1)
+        self.assertNotEqual(list(dataset), first)
+
+    def test_workers(self):
+        out = []
+        for worker in range(3):
+            textaugment.dataset.get_worker_info = lambda: SimpleNamespace(id=worker, num_workers=3)
+            out.append(list(AugmentedDataset(self.sentences, str.upper, rank=1, world_size=2)))
+        self.assertEqual(out[0], [self.sentences[3].upper(), self.sentences[9].upper()])
+        self.assertEqual(sum(out, []), [self.sentences[i].upper() for i in (3, 9, 4, 5)], msg="Shards 3 to 5 of 6")
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.txt")
+            with open(path, "w") as f:
+                f.write("\n".join(self.sentences) + "\n")
+            self.assertEqual(list(AugmentedDataset(path, str.upper)), [s.upper() for s in self.sentences])
+            generator = AugmentedDataset(lambda: iter(self.sentences), str.upper, world_size=2)
+            self.assertEqual(len(list(generator)), 5)
+
+    def test_mixup(self):
+        batches = [(np.ones((4, 3)) * i, np.eye(4)) for i in range(3)]
+        out = list(AugmentedDataset(batches, MIXUP(), alpha=0.4))
+        self.assertEqual(len(out), 3)
+        x, y = out[1]
+        self.assertEqual(x.shape, (4, 3))
+        np.testing.assert_allclose(x, 1.0)
+        np.testing.assert_allclose(y.sum(axis=1), 1.0)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import pickle
+import numpy as np
+from textaugment.dedup import Deduplicator
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_deduplicator(self):
+        with self.assertRaises(TypeError, msg="Expect a float between 0 and 1"):
+            Deduplicator(threshold=2.0)
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            Deduplicator(num_perm=0)
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            Deduplicator(shingle_size="2")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.d = Deduplicator(threshold=0.7, num_perm=128)
+        self.source = "the quick brown fox jumps over the lazy dog near the river bank today"
+
+    def test_signature(self):
+        a = self.d.signature(self.source)
+        self.assertEqual(a.shape, (128,))
+        np.testing.assert_array_equal(a, self.d.signature(self.source.upper()), err_msg="Case is ignored")
+        b = self.d.signature("a completely different sentence about school")
+        self.assertLess(np.mean(a == b), 0.2)
+
+    def test_bands(self):
+        self.assertEqual(self.d.bands * self.d.rows, 128)
+
+    def test_filter(self):
+        variants = [
+            "The quick brown fox jumps over the lazy dog near the river bank today",  # exact duplicate of the source
+            "the quick brown fox jumps over the lazy dog near the river bank now",  # near duplicate of the source
+            "today the dog near the river bank jumps over the quick brown fox",
+            "today the dog near the river bank jumps over the quick brown fox",  # exact duplicate of a sibling
+            "a fox is near the bank",
+        ]
+        kept = self.d.filter(self.source, variants)
+        self.assertEqual(kept, [variants[2], variants[4]])
+        self.assertEqual(self.d.stats, {'kept': 2, 'exact': 2, 'near': 1})
+        self.d.reset()
+        self.assertEqual(self.d.stats, {'kept': 0, 'exact': 0, 'near': 0})
+
+    def test_pickle(self):
+        d = pickle.loads(pickle.dumps(self.d))
+        np.testing.assert_array_equal(d.signature(self.source), self.d.signature(self.source))
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
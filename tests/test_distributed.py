@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+import time
+from textaugment.eda import EDA
+from textaugment.runner import Runner
+from textaugment.distributed import FileLeaseQueue, Worker, Coordinator
+from tests.jobs import WORDNET_JOB, WORDNET_WORKER, start_job
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_queue(self):
+        with self.assertRaises(TypeError, msg="Expect a positive number"):
+            FileLeaseQueue("queue", lease_timeout=0)
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "corpus.txt")
+        with open(self.source, "w") as f:
+            f.write("".join("sentence number {} is going to town\n".format(i) for i in range(23)))
+        self.t = EDA(stop_words=[])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def test_plan(self):
+        q = FileLeaseQueue(self.path("queue"))
+        self.assertIsNone(q.tasks())
+        tasks = q.plan(self.source, 10)
+        self.assertEqual([(t['shard'], t['lines']) for t in tasks], [(0, 10), (1, 10), (2, 3)])
+        self.assertEqual(q.plan(self.source, 5), tasks, msg="An existing plan is kept")
+
+    def test_lease(self):
+        q = FileLeaseQueue(self.path("queue"), lease_timeout=60)
+        q.plan(self.source, 10)
+        self.assertEqual(q.acquire("a")['shard'], 0)
+        self.assertEqual(q.acquire("b")['shard'], 1, msg="Leased shards are skipped")
+        q.complete(0)
+        self.assertTrue(q.done(0))
+        self.assertEqual(q.acquire("c")['shard'], 2)
+        self.assertIsNone(q.acquire("d"))
+        self.assertFalse(q.finished())
+
+    def test_lost_worker(self):
+        expected = Runner(self.t.random_swap, self.path("local"), shard_size=5)
+        expected.run(self.source)
+        expected.merge(self.path("expected.txt"))
+
+        runner = Runner(self.t.random_swap, self.path("out"), shard_size=5)
+        q = FileLeaseQueue(self.path("queue"), lease_timeout=0.2)
+        coordinator = Coordinator(runner, q, poll=0.05)
+        q.plan(self.source, runner.shard_size)
+        self.assertEqual(q.acquire("lost")['shard'], 0)  # A worker takes shard 0 and dies
+        self.assertEqual(Worker(runner, q, name="b", poll=0.05).run(), 5, msg="Shard 0 is queued again")
+        self.assertEqual(q.requeued, 1)
+        self.assertEqual(coordinator.run(self.source, self.path("merged.txt"), timeout=5)['shards'], 5)
+        self.assertEqual(self.read("merged.txt"), self.read("expected.txt"), msg="Same output as a local run")
+
+    def test_same_shard(self):
+        expected = Runner(self.t.random_swap, self.path("local"), shard_size=5)
+        expected.run(self.source)
+        expected.merge(self.path("expected.txt"))
+
+        runner = Runner(self.t.random_swap, self.path("out"), shard_size=5)
+        q = FileLeaseQueue(self.path("queue"), lease_timeout=0.2)
+        q.plan(self.source, runner.shard_size)
+        task = q.acquire("slow")  # A worker takes shard 0 and stalls until its lease expires
+        time.sleep(0.3)
+        _, lines, _ = next(Runner.read_shards(task['source'], task['lines'], task['offset'], task['shard']))
+        finished = threading.Event()
+        errors = list()
+
+        def slow():
+            try:
+                while not finished.is_set():  # Commits shard 0 again and again while b also commits it
+                    runner.commit_shard(0, runner.augment_shard(0, lines))
+                q.complete(0)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=slow)
+        thread.start()
+        try:
+            self.assertEqual(Worker(runner, q, name="b", poll=0.05).run(), 5, msg="Shard 0 is queued again")
+        finally:
+            finished.set()
+            thread.join()
+        self.assertEqual(errors, [])
+        runner.merge(self.path("merged.txt"))
+        self.assertEqual(self.read("merged.txt"), self.read("expected.txt"), msg="Complete shards are committed")
+        self.assertEqual(sorted(name for name in os.listdir(self.path("out")) if name.endswith(".tmp")), [])
+
+    def test_workers_wordnet(self):
+        self.assertEqual(start_job(WORDNET_JOB, [self.source, self.path("local"), "0"], 1).wait(), 0)
+        runner = Runner(str.upper, self.path("local"), shard_size=5)
+        runner.merge(self.path("expected.txt"))
+
+        runner = Runner(str.upper, self.path("out"), shard_size=5)  # The coordinator does not augment
+        q = FileLeaseQueue(self.path("queue"))
+        q.plan(self.source, runner.shard_size)
+        workers = [start_job(WORDNET_WORKER, [self.source, self.path("out"), "0", self.path("queue"), name], seed)
+                   for name, seed in (("a", 2), ("b", 3))]
+        self.assertEqual(Coordinator(runner, q, poll=0.05).run(self.source, self.path("merged.txt"), timeout=60),
+                         {'shards': 5, 'requeued': 0})
+        self.assertEqual([worker.wait() for worker in workers], [0, 0])
+        self.assertEqual(self.read("merged.txt"), self.read("expected.txt"),
+                         msg="Same output as a local run, from workers with other hash seeds")
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import numpy as np
+from textaugment.mixup import MIXUP
+
+
+class InputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.m = MIXUP()
+        self.data = np.random.rand(10, 4)
+
+    def test_flow(self):
+        with self.assertRaises(TypeError, msg="Expect integer batch_size"):
+            self.m.flow(self.data, batch_size="foo")
+
+        with self.assertRaises(TypeError, msg="Expect boolean shuffle"):
+            self.m.flow(self.data, shuffle="foo")
+
+        with self.assertRaises(TypeError, msg="Expect integer random_state"):
+            MIXUP(random_state="foo")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.m = MIXUP(runs=3)
+        self.data = np.random.rand(10, 4)
+        self.labels = np.eye(10)
+
+    def test_mixup_data(self):
+        mixed = self.m.mixup_data(self.data)
+        self.assertEqual(mixed.shape, (30, 4), msg="All runs are returned for unlabelled data")
+
+        mixed, labels = self.m.mixup_data(self.data, self.labels)
+        self.assertEqual(mixed.shape, (30, 4))
+        self.assertEqual(labels.shape, (30, 10))
+        np.testing.assert_allclose(labels.sum(axis=1), 1.0)
+        self.assertTrue(np.all(mixed >= self.data.min()) and np.all(mixed <= self.data.max()))
+
+    def test_mixup_data_out(self):
+        out = np.empty((30, 4))
+        self.assertIs(self.m.mixup_data(self.data, out=out), out, msg="Output is written in place")
+        with self.assertRaises(ValueError, msg="Output must have runs * batch rows"):
+            self.m.mixup_data(self.data, out=np.empty((10, 4)))
+
+    def test_mixup_data_dtype(self):
+        self.assertEqual(self.m.mixup_data(self.data.astype(np.float16)).dtype, np.float16)
+        self.assertEqual(self.m.mixup_data(np.arange(8).reshape(4, 2)).dtype, np.float64, msg="Integers become float")
+
+    def test_flow_reuse_buffers(self):
+        data = np.random.rand(10, 3, 2).astype(np.float32)
+        generator, steps = self.m.flow(data, self.labels, batch_size=4, runs=2, reuse_buffers=True)
+        first, _ = next(generator)
+        second, _ = next(generator)
+        self.assertEqual(first.shape, (8, 3, 2))
+        self.assertEqual(first.dtype, np.float32)
+        self.assertTrue(np.shares_memory(first, second), msg="Batches are written into the same buffer")
+
+    def test_flow_generators(self):
+        first, _ = self.m.flow(self.data, self.labels, batch_size=4, reuse_buffers=True)
+        second, _ = self.m.flow(self.data, self.labels, batch_size=4, reuse_buffers=True)
+        batch, _ = next(first)
+        kept = batch.copy()
+        other, _ = next(second)
+        self.assertFalse(np.shares_memory(batch, other), msg="Generators of an instance have their own buffers")
+        np.testing.assert_array_equal(batch, kept)
+
+    def test_flow_prefetch(self):
+        generator, steps = self.m.flow(self.data, self.labels, batch_size=4, prefetch=2, reuse_buffers=True)
+        batches = [next(generator)[0] for _ in range(4)]
+        self.assertFalse(np.shares_memory(batches[0], batches[1]), msg="Prefetched batches use separate buffers")
+        self.assertEqual(self.m.prefetch_stats['batches'], 4)
+        generator.close()
+        self.assertFalse(any(t.name == "mixup-prefetch" for t in threading.enumerate()), msg="Thread is stopped")
+
+    def test_flow_memmap(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.npy")
+            np.save(path, self.data)
+            generator, steps = self.m.flow(path, self.labels, batch_size=3, block_size=4)
+            self.assertEqual(steps, 4)
+            sizes = sorted(next(generator)[0].shape[0] for _ in range(steps))
+            self.assertEqual(sizes, [1, 3, 3, 3], msg="Blocks are rounded up to a multiple of batch_size")
+            generator.close()
+
+    def test_mixup_data_sparse(self):
+        try:
+            from scipy import sparse
+        except ImportError:
+            self.skipTest("scipy is not installed")
+        np.random.seed(1)
+        dense = self.m.mixup_data(self.data)
+        np.random.seed(1)
+        mixed = self.m.mixup_data(sparse.csr_matrix(self.data))
+        self.assertTrue(sparse.issparse(mixed), msg="Sparse inputs stay sparse")
+        np.testing.assert_allclose(mixed.toarray(), dense)
+
+    def test_mixup_data_lengths(self):
+        data = np.ones((4, 6, 2))
+        lengths = np.array([2, 3, 1, 2])
+        mixed, mixed_lengths = self.m.mixup_data(data, lengths=lengths)
+        self.assertEqual(mixed.shape, (12, 3, 2), msg="Padding past the longest sequence is cut")
+        positions = np.arange(3) < mixed_lengths[:, None]
+        self.assertTrue(np.all(mixed[~positions] == 0), msg="Padding of each pair is zeroed")
+        self.assertTrue(np.allclose(mixed[positions], 1))
+
+        mask = np.arange(6) < lengths[:, None]
+        mixed, labels, mixed_lengths = self.m.mixup_data(data, self.labels[:4], mask=mask)
+        self.assertEqual(mixed.shape, (12, 3, 2))
+
+        with self.assertRaises(ValueError, msg="Sequences need 3D inputs"):
+            self.m.mixup_data(self.data, lengths=np.ones(10))
+
+    def test_flow_bucket(self):
+        lengths = np.array([1, 8, 1, 8, 1, 8, 1, 8])
+        data = np.ones((8, 8, 2))
+        generator, steps = self.m.flow(data, batch_size=4, lengths=lengths, bucket=True)
+        shapes = sorted(next(generator)[0].shape for _ in range(steps))
+        self.assertEqual(shapes, [(4, 1, 2), (4, 8, 2)], msg="Batches hold sequences of similar length")
+
+        with self.assertRaises(ValueError, msg="Bucketing needs lengths"):
+            self.m.flow(data, bucket=True)
+
+    def test_flow(self):
+        generator, steps = self.m.flow(self.data, self.labels, batch_size=4, runs=2)
+        self.assertEqual(steps, 3)
+        shapes = [next(generator)[0].shape for _ in range(steps)]
+        self.assertEqual(shapes, [(8, 4), (8, 4), (4, 4)])
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import sys
+from textaugment.aeda import AEDA
+from textaugment.eda import EDA
+from textaugment.pipeline import Pipeline
+
+
+class InputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.eda = EDA(stop_words=[])
+
+    def test_pipeline(self):
+        with self.assertRaises(TypeError, msg="Expect tuples of (augmenter, method)"):
+            Pipeline([self.eda])
+
+        with self.assertRaises(TypeError, msg="Expect a method of the augmenter"):
+            Pipeline([(self.eda, 'foo')])
+
+        with self.assertRaises(TypeError, msg="Expect a probability"):
+            Pipeline([(self.eda, 'random_swap', 2)])
+
+        with self.assertRaises(TypeError, msg="Expect valid arguments for the method"):
+            Pipeline([(self.eda, 'random_swap', 1.0, {'n': 'foo'})])
+
+    def test_augment(self):
+        with self.assertRaises(TypeError, msg="Expect a valid sentence"):
+            Pipeline([(self.eda, 'random_swap')]).augment(" ")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.eda = EDA(stop_words=[])
+        self.aeda = AEDA()
+        self.data = "John is going to town"
+
+    def test_augment(self):
+        p = Pipeline([(self.eda, 'random_swap', 1.0, {'n': 2}), (self.aeda, 'punct_insertion')])
+        augmented = p.augment(self.data)
+        words = [word for word in augmented.split() if word not in self.aeda.punctuations]
+        self.assertEqual(sorted(words), sorted(self.data.split()), msg="Words are swapped, punctuations inserted")
+        self.assertGreater(len(augmented.split()), len(words))
+
+    def test_probability(self):
+        p = Pipeline([(self.eda, 'random_deletion', 0.0, {'p': 1.0})])
+        self.assertEqual(p.augment(self.data), self.data, msg="Steps with p=0 never run")
+
+    def test_string_method(self):
+        p = Pipeline([(self, 'upper')])
+        self.assertEqual(p.augment(self.data), self.data.upper(), msg="String methods are wrapped")
+
+    def upper(self, sentence):
+        return sentence.upper()
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
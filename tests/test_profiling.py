@@ -0,0 +1,57 @@
+import unittest
+import sys
+from textaugment.eda import EDA
+import numpy as np
+from textaugment.profiling import Profiler, count_filtered
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_profiler(self):
+        with self.assertRaises(TypeError, msg="Expect a callable callback"):
+            Profiler(callback="foo")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.profiler = Profiler(callback=lambda name, seconds: self.calls.append(name))
+        self.t = EDA(stop_words=[], profiler=self.profiler)
+
+    def test_stages(self):
+        self.t.random_swap("John is going to town")
+        stats = self.profiler.stats
+        self.assertEqual(stats['stages']['tokenize']['count'], 1)
+        self.assertEqual(stats['stages']['join']['count'], 1)
+        self.assertGreaterEqual(stats['stages']['tokenize']['time'], 0.0)
+        self.assertEqual(self.calls, ['tokenize', 'join'], msg="Callback is called after each stage")
+
+        self.profiler.reset()
+        self.assertEqual(self.profiler.stats['stages'], {})
+
+    def test_caches(self):
+        self.profiler.hit('synonyms', 3)
+        self.profiler.miss('synonyms')
+        self.assertEqual(self.profiler.stats['caches']['synonyms'], {'hits': 3, 'misses': 1, 'hit_rate': 0.75})
+
+    def test_count_filtered(self):
+        count_filtered(self.profiler, 'synset_index', np.array([True, False, False]))
+        count_filtered(None, 'synset_index', np.array([True]))
+        self.assertEqual(self.profiler.stats['caches']['synset_index']['hits'], 2, msg="Ruled out items are hits")
+        self.assertEqual(self.profiler.stats['caches']['synset_index']['misses'], 1)
+
+    def test_disabled(self):
+        t = EDA(stop_words=[])
+        self.assertIsNone(t.profiler)
+        self.assertIsInstance(t.random_swap("John is going to town"), str)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import sys
+import gc
+import os
+import tempfile
+from unittest import mock
+import gensim
+from nltk.corpus import stopwords
+from textaugment import EDA, Word2vec
+from textaugment.registry import Registry
+
+
+class Owner:
+    pass
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_loader_raises(self):
+        registry = Registry()
+
+        def loader():
+            raise FileNotFoundError("missing")
+
+        with self.assertRaises(FileNotFoundError):
+            registry.hold(Owner(), ('model', 'missing'), loader)
+        self.assertNotIn(('model', 'missing'), registry, msg="Nothing is registered when the loader raises")
+        self.assertEqual(registry.hold(None, ('model', 'missing'), lambda: 1), 1, msg="The next call loads again")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+        self.calls = 0
+
+    def loader(self):
+        self.calls += 1
+        return [self.calls]
+
+    def test_hold(self):
+        a, b = Owner(), Owner()
+        first = self.registry.hold(a, ('words',), self.loader)
+        self.assertIs(self.registry.hold(b, ('words',), self.loader), first, msg="The resource is shared")
+        self.assertEqual(self.calls, 1, msg="The resource is loaded once")
+        self.assertEqual(self.registry.refcount(('words',)), 2)
+        self.registry.release(a)
+        self.assertEqual(self.registry.refcount(('words',)), 1)
+        del b
+        gc.collect()
+        self.assertEqual(self.registry.refcount(('words',)), 0, msg="Collected owners stop holding the resource")
+        self.assertEqual(self.registry.stats, {'loads': 1, 'resources': {('words',): 0}})
+
+    def test_evict(self):
+        owner = Owner()
+        self.registry.hold(owner, ('held',), self.loader)
+        self.registry.get(('free',), self.loader)
+        self.assertEqual(len(self.registry), 2)
+        self.assertEqual(self.registry.evict(), 1, msg="Only resources no object holds are evicted")
+        self.assertNotIn(('free',), self.registry)
+        self.assertEqual(self.registry.evict(('held',)), 0)
+        self.assertEqual(self.registry.evict(('held',), force=True), 1)
+        self.assertEqual(self.registry.hold(owner, ('held',), self.loader), [3], msg="Evicted resources load again")
+
+    def test_eda(self):
+        try:
+            stopwords.ensure_loaded()
+        except LookupError:
+            self.skipTest("nltk stopwords are not downloaded")
+        with mock.patch('textaugment.eda.REGISTRY', self.registry):
+            t1, t2 = EDA(), EDA()
+            t3 = EDA(stop_words=["is"])
+        self.assertIs(t1.stopwords, t2.stopwords, msg="The default stopwords are shared")
+        self.assertIs(t1._stopword_mask, t2._stopword_mask)
+        self.assertEqual(self.registry.refcount(('stopwords', 'english')), 2)
+        self.assertEqual(t3.stopwords, ["is"])
+        self.assertIsNot(t3._stopword_mask, t1._stopword_mask)
+
+    def test_word2vec(self):
+        sentences = [s.split() for s in ["john is going to town", "mary is going to school"]] * 5
+        model = gensim.models.Word2Vec(sentences, vector_size=8, min_count=1, seed=1, workers=1)
+        with tempfile.TemporaryDirectory() as tmp, mock.patch('textaugment.word2vec.REGISTRY', self.registry):
+            path = os.path.join(tmp, "model")
+            model.save(path)
+            w1 = Word2vec(model=path, v=True)
+            w2 = Word2vec(model=path, v=True)
+            self.assertIs(w1.model, w2.model, msg="The model is loaded once")
+            self.assertEqual(self.registry.loads, 2, msg="Model and known words")
+            self.assertEqual(self.registry.refcount(('word2vec',) + w1._model_key), 2)
+            w1.augment("john is going to town")
+            self.assertIs(w1._neighbour_cache(), w2._neighbour_cache(), msg="The neighbours are shared")
+            self.assertGreater(len(w2._neighbour_cache()), 0)
+            w3 = Word2vec(model=path, mmap='r')
+            self.assertIsNot(w3.model, w1.model, msg="Other loading options are other resources")
+            os.utime(path, ns=(0, 0))  # e.g. the model was trained again
+            self.assertIsNot(Word2vec(model=path).model, w1.model, msg="Another version of the file is loaded")
+            del w1, w2, w3
+            gc.collect()
+            self.assertEqual(self.registry.evict(), 6)
+            self.assertEqual(len(self.registry), 0)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import threading
+from textaugment.eda import EDA
+from textaugment.runner import Runner, shard_seed, atomic_write
+from tests.jobs import WORDNET_JOB, start_job
+
+
+class Crash(Exception):
+    pass
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_runner(self):
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            Runner(str.upper, "out", shard_size=0)
+        with self.assertRaises(TypeError, msg="Expect an integer seed"):
+            Runner(str.upper, "out", seed="1")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "corpus.txt")
+        with open(self.source, "w") as f:
+            f.write("".join("sentence number {} is going to town\n".format(i) for i in range(23)))
+        self.t = EDA(stop_words=[])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def output(self, name):
+        with open(os.path.join(self.tmp.name, name)) as f:
+            return f.read()
+
+    def test_seed(self):
+        self.assertEqual(shard_seed(1, 3), shard_seed(1, 3))
+        self.assertNotEqual(shard_seed(1, 3), shard_seed(1, 4))
+
+    def test_atomic_write(self):
+        path = os.path.join(self.tmp.name, "shard.txt")
+        errors = list()
+
+        def write(data):
+            try:
+                for _ in range(200):
+                    atomic_write(path, data)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(data,)) for data in (b"a" * 100000, b"b" * 100000)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [], msg="Concurrent writers do not share a temporary file")
+        self.assertIn(self.output("shard.txt"), ("a" * 100000, "b" * 100000), msg="The file is never partial")
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["corpus.txt", "shard.txt"], msg="No temporary file is left")
+
+    def test_run(self):
+        r = Runner(self.t.random_swap, os.path.join(self.tmp.name, "a"), shard_size=5, n_variants=2)
+        self.assertEqual(r.run(self.source), {'shards': 5, 'lines': 23, 'resumed': 0})
+        self.assertEqual(r.run(self.source)['resumed'], 5, msg="A finished job is not run again")
+        r.merge(os.path.join(self.tmp.name, "a.txt"))
+        self.assertEqual(len(self.output("a.txt").splitlines()), 46)
+
+    def test_resume(self):
+        Runner(self.t.random_swap, os.path.join(self.tmp.name, "a"), shard_size=5).run(self.source)
+        calls = []
+
+        def crash(sentence):
+            calls.append(sentence)
+            if len(calls) > 12:
+                raise Crash()
+            return self.t.random_swap(sentence)
+
+        r = Runner(crash, os.path.join(self.tmp.name, "b"), shard_size=5)
+        with self.assertRaises(Crash):
+            r.run(self.source)
+        with open(r.checkpoint_path) as f:
+            self.assertEqual(json.load(f)['next_shard'], 2, msg="Two shards are committed")
+        self.assertFalse(os.path.exists(r.shard_path(2)), msg="The failed shard is not committed")
+        result = Runner(self.t.random_swap, os.path.join(self.tmp.name, "b"), shard_size=5).run(self.source)
+        self.assertEqual(result, {'shards': 5, 'lines': 23, 'resumed': 2})
+        for shard in range(5):
+            self.assertEqual(self.output("a/shard-{:06d}.txt".format(shard)),
+                             self.output("b/shard-{:06d}.txt".format(shard)), msg="Same output as without crash")
+
+    def run_wordnet(self, output_dir, hash_seed, crash=0):
+        """Run the Wordnet job in a process with the given hash seed"""
+        return start_job(WORDNET_JOB, [self.source, output_dir, str(crash)], hash_seed).wait()
+
+    def test_resume_wordnet(self):
+        self.assertEqual(self.run_wordnet(os.path.join(self.tmp.name, "a"), 1), 0)
+        self.assertEqual(self.run_wordnet(os.path.join(self.tmp.name, "b"), 2, crash=12), 3)
+        self.assertEqual(self.run_wordnet(os.path.join(self.tmp.name, "b"), 3), 0)
+        self.assertLess(self.output("a/shard-000000.txt").count("town"), 5, msg="Words are replaced")
+        for shard in range(5):
+            self.assertEqual(self.output("a/shard-{:06d}.txt".format(shard)),
+                             self.output("b/shard-{:06d}.txt".format(shard)),
+                             msg="Same output as without crash, in processes with other hash seeds")
+
+    def test_other_job(self):
+        Runner(str.upper, self.tmp.name, shard_size=5).run(self.source)
+        with self.assertRaises(ValueError, msg="Checkpoint of a job with another shard size"):
+            Runner(str.upper, self.tmp.name, shard_size=6).run(self.source)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
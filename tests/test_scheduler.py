@@ -0,0 +1,91 @@
+import unittest
+import sys
+from textaugment.scheduler import Scheduler
+
+
+class Clock:
+    """Fake clock advanced by the fake augmenters"""
+
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+    def augmenter(self, cost, mark):
+        def augment(sentence):
+            self.time += cost
+            return sentence + mark
+        return augment
+
+
+class InputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.fast = self.clock.augmenter(0.001, "!")
+
+    def test_scheduler(self):
+        with self.assertRaises(TypeError, msg="Expect one of budget or rate"):
+            Scheduler([(self.fast, 1)])
+        with self.assertRaises(TypeError, msg="Expect one of budget or rate"):
+            Scheduler([(self.fast, 1)], budget=1, rate=1)
+        with self.assertRaises(TypeError, msg="Expect a positive ratio"):
+            Scheduler([(self.fast, 0)], rate=1)
+        with self.assertRaises(TypeError, msg="Expect unique names"):
+            Scheduler([(self.fast, 1), (self.fast, 1)], rate=1)
+
+    def test_run(self):
+        s = Scheduler([(self.fast, 1)], budget=10)
+        with self.assertRaises(TypeError, msg="Expect a total with a budget"):
+            next(s.run(iter(["a"])))
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.fast = self.clock.augmenter(0.001, "!")
+        self.slow = self.clock.augmenter(0.1, "?")
+
+    def test_rate(self):
+        s = Scheduler([(self.fast, 1, "fast"), (self.slow, 1, "slow")], rate=1.0, max_variants=100, clock=self.clock)
+        out = list(s.run(["sentence"] * 200))
+        self.assertEqual(out[0], ("sentence", ["sentence!", "sentence?"]), msg="First sentence measures the costs")
+        stats = s.stats
+        self.assertEqual(stats['sentences'], 200)
+        self.assertAlmostEqual(stats['elapsed'], 200, delta=2)
+        self.assertAlmostEqual(stats['augmenters']['fast']['share'], 0.5, delta=0.01)
+        self.assertAlmostEqual(stats['augmenters']['slow']['cost'], 0.1)
+        self.assertGreater(stats['variants'], 3000)
+
+    def test_budget(self):
+        s = Scheduler([(self.fast, 3, "fast"), (self.slow, 1, "slow")], budget=20.0, max_variants=100,
+                      clock=self.clock)
+        for _ in s.run(["sentence"] * 100):
+            pass
+        self.assertAlmostEqual(s.stats['elapsed'], 20, delta=0.5)
+        self.assertAlmostEqual(s.stats['augmenters']['fast']['share'], 0.75, delta=0.02)
+        self.assertAlmostEqual(s.stats['augmenters']['fast']['target'], 0.75)
+
+    def test_behind(self):
+        slower = self.clock.augmenter(2.0, "?")
+        s = Scheduler([(slower, 1)], rate=1.0, clock=self.clock)
+        counts = [len(variants) for sentence, variants in s.run(["sentence"] * 20)]
+        self.assertLessEqual(s.stats['elapsed'], 21, msg="Variants are skipped to keep the rate")
+        self.assertLessEqual(sum(counts), 10)
+
+    def test_max_variants(self):
+        s = Scheduler([(self.fast, 1)], rate=1.0, max_variants=3, clock=self.clock)
+        counts = [len(variants) for sentence, variants in s.run(["sentence"] * 10)]
+        self.assertEqual(counts[1:], [3] * 9)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import pickle
+import unittest
+import sys
+import tempfile
+from textaugment.eda import EDA
+from textaugment.profiling import Profiler
+from textaugment.word2vec import Word2vec
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def test_pickle_eda(self):
+        t = EDA(stop_words=["is"], profiler=Profiler())
+        t.random_swap("John is going to town")
+        copy = pickle.loads(pickle.dumps(t))
+        self.assertEqual(copy.stopwords, ["is"])
+        self.assertEqual(copy.profiler.stats, t.profiler.stats)
+
+    def test_pickle_word2vec(self):
+        try:
+            import gensim
+        except ImportError:
+            self.skipTest("gensim is not installed")
+        sentences = [["i", "love", "school"], ["we", "love", "town"]] * 20
+        model = gensim.models.Word2Vec(sentences, vector_size=8, min_count=1, seed=1, workers=1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model")
+            model.save(path)
+            w = Word2vec(model=path, mmap='r', v=True).warmup()
+            dumped = pickle.dumps(w)
+            self.assertLess(len(dumped), 2000, msg="Only the path of the model is pickled")
+            copy = pickle.loads(dumped)
+            self.assertEqual(copy.model.wv.index_to_key, model.wv.index_to_key)
+            self.assertIsInstance(copy.augment("i love school"), str)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+from unittest import mock
+from textaugment.eda import EDA
+from textaugment.tokenizer import Tokenizer, Tokens, TOKENIZER, match_case
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_tokenizer(self):
+        with self.assertRaises(TypeError, msg="Expect a Tokenizer or a bool"):
+            EDA(stop_words=[], tokenizer="foo")
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.t = Tokenizer()
+        self.text = "John's  going to town-hall, (really) fast!"
+
+    def test_tokenize(self):
+        tokens = self.t.tokenize(self.text)
+        self.assertIsInstance(tokens, Tokens)
+        self.assertEqual(tokens, ["John's", "going", "to", "town-hall", ",", "(", "really", ")", "fast", "!"])
+        self.assertEqual([self.text[start:end] for start, end in tokens.spans], tokens)
+
+    def test_join(self):
+        self.assertEqual(self.t.join(["(", "really", ")", "fast", ",", "yes", "!"]), "(really) fast, yes!")
+
+    def test_rebuild(self):
+        tokens = self.t.tokenize(self.text)
+        words = [w.lower() for w in tokens]
+        self.assertEqual(self.t.rebuild(tokens, words), self.text, msg="Unchanged words keep their casing")
+        words[0], words[3] = "jack's", "city"
+        self.assertEqual(self.t.rebuild(tokens, words), "Jack's  going to city, (really) fast!")
+        self.assertEqual(self.t.rebuild(tokens, words[:-1]), "jack's going to city, (really) fast",
+                         msg="Joined when tokens are deleted")
+
+    def test_match_case(self):
+        self.assertEqual(match_case("NASA", "agency"), "AGENCY")
+        self.assertEqual(match_case("John", "jack"), "Jack")
+        self.assertEqual(match_case("a", "the"), "the")
+
+    def test_default(self):
+        self.assertIs(EDA(stop_words=[], tokenizer=True).tokenizer, TOKENIZER)
+        self.assertIsNone(EDA(stop_words=[], tokenizer=False).tokenizer)
+
+    def test_eda(self):
+        t = EDA(stop_words=[], tokenizer=self.t)
+        self.assertEqual(t._tokenize("Hello, world."), ["Hello", ",", "world", "."])
+        out = t.random_swap("Hello, world.", n=2)
+        self.assertEqual(sorted(self.t.tokenize(out)), [",", ".", "Hello", "world"])
+
+    def test_word2vec(self):
+        import gensim
+        from textaugment.word2vec import Word2vec
+        sentences = [["i", "love", "school", "and", "home"], ["you", "love", "home", "school"]] * 20
+        model = gensim.models.Word2Vec(sentences, vector_size=8, min_count=1, seed=1, workers=1)
+        w = Word2vec(model=model, v=True, tokenizer=self.t, random_state=1)
+        out = w.augment("I  love SCHOOL!")
+        self.assertRegex(out, r"^[A-Z][a-z]*  [a-z]+ [A-Z]+!$", msg="Whitespace, punctuation and casing are kept")
+
+    def test_wordnet(self):
+        from textaugment.wordnet import Wordnet
+        tagged = []
+
+        class Tagger:
+            def tag(self, words):
+                tagged.append(words)
+                return [(word, '.') for word in words]
+
+        w = Wordnet(v=False, n=False, tokenizer=self.t)
+        with mock.patch.object(Wordnet, '_tagger', lambda self: Tagger()), \
+                mock.patch('textaugment.wordnet.wordnet', mock.Mock(VERB='v', NOUN='n')):
+            self.assertEqual(w.augment("John went to Paris."), "John went to Paris.")
+        self.assertEqual(tagged, [["John", "went", "to", "Paris", "."]], msg="The tagger sees the original casing")
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import sys
+import pickle
+import threading
+import numpy as np
+from textaugment.vocab import Vocabulary, VOCABULARY
+
+
+class InputTestCase(unittest.TestCase):
+
+    def test_vocabulary(self):
+        with self.assertRaises(TypeError, msg="Expect a positive integer"):
+            Vocabulary(max_size=0)
+
+    def test_clear(self):
+        vocabulary = Vocabulary()
+        with vocabulary.session():
+            with self.assertRaises(RuntimeError, msg="Ids in use would no longer be valid"):
+                vocabulary.clear()
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.vocabulary = Vocabulary()
+
+    def test_encode(self):
+        words = "john is going to town to".split()
+        ids = self.vocabulary.encode(words)
+        self.assertEqual(ids.dtype, np.int32)
+        self.assertEqual(ids[3], ids[5], msg="Equal words have equal ids")
+        self.assertEqual(len(self.vocabulary), 5)
+        self.assertEqual(self.vocabulary.decode(ids), words)
+        self.assertEqual(self.vocabulary.intern("town"), ids[4])
+
+    def test_bitmap(self):
+        stop = self.vocabulary.bitmap({"is", "to"}.__contains__)
+        ids = self.vocabulary.encode("john is going to town".split())
+        self.assertEqual(stop[ids].tolist(), [False, True, False, True, False])
+        ids = self.vocabulary.encode("to school".split())
+        self.assertEqual(stop[ids].tolist(), [True, False], msg="New words are added to the bitmap")
+
+    def test_pickle(self):
+        self.assertIs(pickle.loads(pickle.dumps(VOCABULARY)), VOCABULARY, msg="Shared vocabulary is a reference")
+        self.vocabulary.encode(["john"])
+        self.vocabulary.table('synonyms')[0] = ("jon",)
+        copy = pickle.loads(pickle.dumps(self.vocabulary))
+        self.assertEqual(copy.words, ["john"])
+        self.assertEqual(copy.table('synonyms'), {0: ("jon",)})
+
+    def test_session(self):
+        vocabulary = Vocabulary(max_size=3)
+        stop = vocabulary.bitmap({"is"}.__contains__)
+        with vocabulary.session():
+            with vocabulary.session():
+                ids = vocabulary.encode("john is going to town".split())
+            vocabulary.table('synonyms')[0] = ("jon",)
+            self.assertEqual(vocabulary.decode(ids)[4], "town", msg="Ids stay valid until the session ends")
+        self.assertEqual(len(vocabulary), 5)
+        with vocabulary.session():
+            self.assertEqual(len(vocabulary), 0, msg="The vocabulary is cleared when the next session starts")
+            self.assertEqual(vocabulary.table('synonyms'), {})
+            ids = vocabulary.encode(["is", "school"])
+            self.assertEqual(stop[ids].tolist(), [True, False], msg="Bitmaps are computed again")
+        self.assertEqual((vocabulary.generation, vocabulary.evictions), (1, 1))
+
+    def test_session_threads(self):
+        vocabulary = Vocabulary(max_size=50)
+        stop = vocabulary.bitmap(lambda word: word.endswith("0"))
+        errors = list()
+
+        def work(n):
+            try:
+                for i in range(200):
+                    with vocabulary.session():
+                        words = ["w{}_{}".format(n, j) for j in range(i % 20)]
+                        ids = vocabulary.encode(words)
+                        assert stop[ids].tolist() == [word.endswith("0") for word in words]
+                        assert vocabulary.decode(ids) == words
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertGreater(vocabulary.evictions, 0)
+        self.assertLessEqual(len(vocabulary), 50 + 4 * 19)
+
+
+class PlatformTestCase(unittest.TestCase):
+
+    def test_platform(self):
+        self.assertEqual(sys.version_info[0], 3, msg="Must be using Python 3")
+
+
+if __name__ == '__main__':
+    unittest.main()
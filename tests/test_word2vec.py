@@ -1,6 +1,10 @@
 import unittest
 import sys
-from textaugment.word2vec import Word2vec
+import numpy as np
+import os
+import tempfile
+from textaugment.vocab import Vocabulary
+from textaugment.word2vec import Word2vec, QuantizedVectors, alias_table, alias_draw
 
 
 class InputTestCase(unittest.TestCase):
@@ -39,6 +43,92 @@ class OutputTestCase(unittest.TestCase):
         self.assertEqual(self.w.augment("4"), "4", msg="Input should not be numbers")
 
 
+class SamplingTestCase(unittest.TestCase):
+
+    def test_alias_table(self):
+        prob, alias = alias_table([0.5, 0.25, 0.25, -0.1])
+        self.assertEqual(prob.dtype, np.float32)
+        self.assertEqual(alias.dtype, np.int32)
+        # Probability of each outcome: kept with prob[i] plus taken as alias of the others
+        p = np.array([prob[i] + sum(1 - prob[j] for j in range(4) if alias[j] == i and j != i) for i in range(4)]) / 4
+        np.testing.assert_allclose(p, [0.5, 0.25, 0.25, 0.0], atol=1e-6)
+        np.testing.assert_allclose(alias_table([-1.0, -2.0])[0], [1.0, 1.0], err_msg="Uniform if no positive weight")
+
+    def test_alias_draw(self):
+        np.random.seed(1)
+        table = alias_table([0.7, 0.2, 0.1, 0.0])
+        draws = alias_draw([table] * 20000)
+        self.assertEqual(draws.shape, (20000,))
+        np.testing.assert_allclose(np.bincount(draws, minlength=4) / 20000, [0.7, 0.2, 0.1, 0.0], atol=0.02)
+
+    def test_augment(self):
+        import gensim
+        sentences = [["i", "love", "school", "and", "home"], ["you", "love", "home", "school"]] * 20
+        model = gensim.models.Word2Vec(sentences, vector_size=8, min_count=1, seed=1, workers=1)
+        w = Word2vec(model=model, p=0.9, runs=2, random_state=1)
+        self.assertEqual(len(w.augment("I love school today").split()), 4, msg="Negative similarities are allowed")
+
+    def test_clear(self):
+        import gensim
+        sentences = [["i", "love", "school", "and", "home"], ["you", "love", "home", "school"]] * 20
+        model = gensim.models.Word2Vec(sentences, vector_size=8, min_count=1, seed=1, workers=1)
+        w = Word2vec(model=model, v=True, random_state=1)
+        w.vocabulary = Vocabulary()
+        w._index()
+        w.vocabulary.encode("i love school".split() + [str(i) for i in range(20)])
+        w.augment("i love school")
+        w.vocabulary.clear()
+        w.vocabulary.encode(["today"])
+        self.assertEqual(len(w.augment("i love school").split()), 3, msg="Neighbours are searched again")
+
+
+class QuantizeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        import gensim
+        rng = np.random.RandomState(1)
+        sentences = [["w{}".format(i) for i in rng.randint(0, 200, size=8)] for _ in range(500)]
+        self.model = gensim.models.Word2Vec(sentences, vector_size=32, min_count=1, seed=1, workers=1)
+
+    def test_input(self):
+        with self.assertRaises(TypeError, msg="Expect float16 or int8"):
+            Word2vec(model=self.model, quantize="int4")
+        with self.assertRaises(TypeError, msg="Expect a non-negative integer"):
+            Word2vec(model=self.model, quantize="int8", rerank=-1)
+
+    def test_most_similar(self):
+        wv = self.model.wv
+        expected = [w for w, s in wv.most_similar("w1", topn=5)]
+        for dtype, itemsize in (('float16', 2), ('int8', 1)):
+            q = QuantizedVectors(wv.vectors, dtype=dtype)
+            self.assertEqual(q.data.dtype.itemsize, itemsize)
+            found = [wv.index_to_key[i] for i, s in q.most_similar(wv.key_to_index["w1"], topn=5)]
+            self.assertGreaterEqual(len(set(found) & set(expected)), 3)
+            wv.fill_norms()
+            reranked = q.most_similar(wv.key_to_index["w1"], topn=5, exact=(wv.vectors, wv.norms), rerank=20)
+            self.assertEqual([wv.index_to_key[i] for i, s in reranked], expected)
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model")
+            self.model.save(path)
+            w = Word2vec(model=path, quantize="int8", rerank=10, v=True)
+            self.assertTrue(os.path.exists(path + ".int8.npy"), msg="The quantized copy is saved alongside the model")
+            w = Word2vec(model=path, quantize="int8", mmap="r")
+            self.assertIsInstance(w.search_index.data, np.memmap)
+            self.assertEqual(len(w.augment("w1 w2 w3").split()), 3)
+
+    def test_stale(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "model")
+            self.model.save(path)
+            QuantizedVectors(self.model.wv.vectors).save(path + ".int8", source=path)
+            self.assertTrue(QuantizedVectors.exists(path + ".int8", source=path))
+            os.utime(path, ns=(0, 0))  # e.g. the model was trained again with the same vocabulary
+            self.assertFalse(QuantizedVectors.exists(path + ".int8", source=path), msg="The copy is out of date")
+            self.assertTrue(QuantizedVectors.exists(path + ".int8"))
+
+
 class PlatformTestCase(unittest.TestCase):
 
     def test_platform(self):
@@ -1,7 +1,11 @@
 import unittest
 import sys
 import numpy as np
-from textaugment.wordnet import Wordnet
+from unittest import mock
+from nltk.corpus import wordnet
+from textaugment.wordnet import Wordnet, synset_mask
+from textaugment.vocab import Vocabulary
+from textaugment.registry import Registry
 
 
 class InputTestCase(unittest.TestCase):
@@ -42,6 +46,35 @@ class OutputTestCase(unittest.TestCase):
     def test_geometric(self):
         self.assertIsInstance(self.w.geometric(data=self.data), np.ndarray)
 
+    def test_synset_mask(self):
+        try:
+            wordnet.ensure_loaded()
+        except LookupError:
+            self.skipTest("nltk wordnet is not downloaded")
+        vocabulary = Vocabulary()
+        mask = synset_mask(vocabulary)
+        self.assertIs(synset_mask(vocabulary), mask, msg="The index is built once")
+        ids = vocabulary.encode(["School", "going", "xqzv"])
+        self.assertEqual(mask[ids].tolist(), [True, True, False])
+
+    def test_synset_mask_lemmas(self):
+        vocabulary = Vocabulary()
+        loads = []
+
+        def all_lemma_names(pos=None, lang="eng"):
+            loads.append(vocabulary._lock.locked())
+            return ["school", "town"]
+
+        stand_in = mock.Mock(all_lemma_names=all_lemma_names, morphy=lambda word, pos: None)
+        with mock.patch('textaugment.wordnet.wordnet', stand_in), \
+                mock.patch('textaugment.wordnet.REGISTRY', Registry()):
+            ids = vocabulary.encode(["School", "xqzv"])
+            self.assertEqual(synset_mask(vocabulary)[ids].tolist(), [True, False])
+            vocabulary.clear()
+            ids = vocabulary.encode(["town", "school"])
+            self.assertEqual(synset_mask(vocabulary)[ids].tolist(), [True, True])
+        self.assertEqual(loads, [False], msg="The lemmas are read once, without the vocabulary lock")
+
 
 class PlatformTestCase(unittest.TestCase):
 
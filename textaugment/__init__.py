@@ -6,6 +6,10 @@ from .wordnet import Wordnet
 from .eda import EDA
 from .aeda import AEDA
 from .mixup import MIXUP
+from .pipeline import Pipeline
+from .profiling import Profiler
+from .columnar import Columnar
+from .dedup import Deduplicator
 from .constants import LANGUAGES
 
 name = "textaugment"
@@ -24,5 +28,9 @@ __all__ = [
     'EDA',
     'AEDA',
     'MIXUP',
+    'Pipeline',
+    'Profiler',
+    'Columnar',
+    'Deduplicator',
     'LANGUAGES'
 ]
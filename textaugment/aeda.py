@@ -11,9 +11,11 @@
 This module is an implementation of the original AEDA algorithm (2021) [1].
 """
 import random
+import numpy as np
+from .aio import AsyncMixin
 
 
-class AEDA:
+class AEDA(AsyncMixin):
     """
     This class is an implementation of the original AEDA algorithm (2021) [1].
 
@@ -34,6 +36,29 @@ class AEDA:
         if 'sentence' in kwargs:
             if not isinstance(kwargs['sentence'].strip(), str) or len(kwargs['sentence'].strip()) == 0:
                 raise TypeError("sentence must be a valid sentence")
+        if 'sentences' in kwargs:
+            if isinstance(kwargs['sentences'], str):
+                raise TypeError("sentences must be a list of sentences")
+            for sentence in kwargs['sentences']:
+                if not isinstance(sentence, str) or len(sentence.strip()) == 0:
+                    raise TypeError("sentences must contain valid sentences")
+        if 'n_variants' in kwargs:
+            if not isinstance(kwargs['n_variants'], int) or kwargs['n_variants'] < 1:
+                raise TypeError("n_variants must be a positive integer")
+
+    @staticmethod
+    def _insert(words, positions, puncts):
+        """Insert punctuations before the words at the given positions in one pass"""
+        order = sorted(range(len(positions)), key=positions.__getitem__)
+        augmented_sentence = []
+        start = 0
+        for i in order:
+            pos = positions[i]
+            augmented_sentence.extend(words[start:pos])
+            augmented_sentence.append(puncts[i])
+            start = pos
+        augmented_sentence.extend(words[start:])
+        return augmented_sentence
 
     def __init__(self, punctuations=['.', ';', '?', ':', '!', ','], random_state=1):
         """A method to initialize parameters
@@ -50,9 +75,14 @@ class AEDA:
         self.random_state = random_state
         if isinstance(self.random_state, int):
             random.seed(self.random_state)
+            np.random.seed(self.random_state)
         else:
             raise TypeError("random_state must have type int")
 
+    def _augment_sync(self, sentence):
+        """Insert punctuations, used by augment_async"""
+        return self.punct_insertion(sentence)
+
     def punct_insertion(self, sentence: str):
         """Insert random punctuations to the sentence
 
@@ -64,18 +94,75 @@ class AEDA:
         """
         self.validate(sentence=sentence)
 
-        sentence = sentence.strip().split(' ')
-        len_sentence = len(sentence)
+        augmented_sentence = ' '.join(self._punct_insertion(sentence.strip().split(' ')))
+
+        return augmented_sentence
+
+    def _punct_insertion(self, words):
+        """Insert random punctuations to the list of words"""
+        len_sentence = len(words)
         # Get random number of punctuations to be inserted
         # The number of punctuations to be inserted is between 1 and 1/3 of the length of the sentence
-        num_punctuations = random.randint(1, len_sentence // 3)
-        augmented_sentence = sentence.copy()
+        num_punctuations = random.randint(1, max(1, len_sentence // 3))
 
-        # Insert random punctuations in random positions
-        for _ in range(num_punctuations):
-            punct = random.choice(self.punctuations) # Select punctuation to be inserted
-            pos = random.randint(0, len(augmented_sentence) - 1) # Select position to insert punctuation
-            augmented_sentence = augmented_sentence[:pos] + [punct] + augmented_sentence[pos:] # Insert punctuation
-        augmented_sentence = ' '.join(augmented_sentence)
+        # Draw all punctuations and positions up front, then build the sentence in one pass
+        puncts = [random.choice(self.punctuations) for _ in range(num_punctuations)]
+        positions = [random.randint(0, len_sentence - 1) for _ in range(num_punctuations)]
+        return self._insert(words, positions, puncts)
 
-        return augmented_sentence
+    def punct_insertion_batch(self, sentences):
+        """Insert random punctuations to many sentences. Random draws for the whole batch are done with numpy.
+
+        :type sentences: list
+        :param sentences: List of sentences
+
+        :rtype:   list
+        :return:  List of augmented sentences
+        """
+        return [variants[0] for variants in self.augment_batch(sentences, n_variants=1)]
+
+    def augment_batch(self, sentences, n_variants=1):
+        """Generate n_variants augmented sentences for each sentence. Sentences are tokenized once and the number of
+        punctuations, their positions and their marks are drawn for the whole batch in a few vectorized calls.
+
+        :type sentences: list
+        :param sentences: List of sentences
+        :type n_variants: int
+        :param n_variants: (optional) Number of augmented sentences per sentence
+
+        :rtype:   list
+        :return:  List with a list of n_variants augmented sentences per sentence
+        """
+        self.validate(sentences=sentences, n_variants=n_variants)
+
+        tokens = [sentence.strip().split(' ') for sentence in sentences]
+        if len(tokens) == 0:
+            return []
+        # One row per (sentence, variant), sentence major
+        lengths = np.repeat([len(words) for words in tokens], n_variants)
+        num_rows = lengths.shape[0]
+        num_punctuations = np.random.randint(1, np.maximum(1, lengths // 3) + 1)
+        total = int(num_punctuations.sum())
+        rows = np.repeat(np.arange(num_rows), num_punctuations)
+        positions = (np.random.random(total) * lengths[rows]).astype(np.int64)
+        puncts = np.random.randint(0, len(self.punctuations), total)
+
+        # Sort punctuations by row then position to find where each lands in the output
+        order = np.lexsort((positions, rows))
+        positions, puncts = positions[order], puncts[order]
+        row_sizes = lengths + num_punctuations
+        row_ends = np.cumsum(row_sizes)
+        rank = np.arange(total) - np.repeat(np.cumsum(num_punctuations) - num_punctuations, num_punctuations)
+        targets = (row_ends - row_sizes)[rows] + positions + rank
+
+        # Words fill the remaining slots in order
+        augmented = np.empty(int(row_ends[-1]), dtype=object)
+        is_punct = np.zeros(augmented.shape[0], dtype=bool)
+        is_punct[targets] = True
+        augmented[targets] = np.array(self.punctuations, dtype=object)[puncts]
+        augmented[~is_punct] = [word for words in tokens for _ in range(n_variants) for word in words]
+
+        augmented = augmented.tolist()
+        bounds = np.concatenate(([0], row_ends)).tolist()
+        rows = [' '.join(augmented[bounds[i]:bounds[i + 1]]) for i in range(num_rows)]
+        return [rows[i:i + n_variants] for i in range(0, num_rows, n_variants)]
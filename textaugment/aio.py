@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# TextAugment: asyncio support
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module adds augment_async and augment_batch_async to the augmenters. CPU-bound augmenters run in an executor so
+that they do not block the event loop, and the number of concurrent calls per augmenter is bounded.
+"""
+import asyncio
+import functools
+import weakref
+
+
+class AsyncMixin:
+    """
+    Run augmentation from asyncio code. Calls are offloaded to an executor (the default executor of the loop unless
+    one is configured) and at most max_concurrency calls of an augmenter run at the same time, further calls wait.
+
+    Example usage: ::
+        >>> import asyncio
+        >>> from textaugment import Wordnet
+        >>> t = Wordnet()
+        >>> t.configure_async(max_concurrency=4)
+        >>> asyncio.run(t.augment_batch_async(['I love school', 'I am going to town']))
+        ['i adore school', 'i am going to town']
+    """
+
+    executor = None
+    max_concurrency = 8
+
+    def configure_async(self, executor=None, max_concurrency=8):
+        """Set the executor and the concurrency bound used by the async methods
+
+        :type executor: concurrent.futures.Executor
+        :param executor: (optional) Executor for CPU-bound work. None uses the default executor of the loop
+        :type max_concurrency: int
+        :param max_concurrency: (optional) Maximum number of concurrent calls of this augmenter
+        """
+        if not isinstance(max_concurrency, int) or max_concurrency < 1:
+            raise TypeError("max_concurrency must be a positive integer")
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.__dict__.pop('_limiters', None)
+
+    def _limiter(self):
+        """Semaphore bounding concurrent calls, one per event loop"""
+        limiters = self.__dict__.get('_limiters')
+        if limiters is None:
+            limiters = self.__dict__['_limiters'] = weakref.WeakKeyDictionary()
+        loop = asyncio.get_running_loop()
+        if loop not in limiters:
+            limiters[loop] = asyncio.Semaphore(self.max_concurrency)
+        return limiters[loop]
+
+    def _augment_sync(self, data, *args, **kwargs):
+        """The blocking call run by augment_async"""
+        return self.augment(data, *args, **kwargs)
+
+    async def _augment_async(self, data, *args, **kwargs):
+        """Run the blocking call in the executor"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self._augment_sync, data, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    async def augment_async(self, data, *args, **kwargs):
+        """Augment data without blocking the event loop. Arguments are those of the blocking method.
+
+        :type data: str
+        :param data: Input data
+
+        :rtype:   str
+        :return:  The augmented data
+        """
+        async with self._limiter():
+            return await self._augment_async(data, *args, **kwargs)
+
+    async def augment_batch_async(self, data, *args, **kwargs):
+        """Augment many inputs concurrently, at most max_concurrency at a time. Results keep the input order.
+
+        :type data: list
+        :param data: List of inputs
+
+        :rtype:   list
+        :return:  List of augmented data
+        """
+        if isinstance(data, str):
+            raise TypeError("data must be a list of inputs")
+        return list(await asyncio.gather(*[self.augment_async(d, *args, **kwargs) for d in data]))
+
+    def __getstate__(self):
+        """Executors and semaphores are not shared with copies"""
+        state = self.__dict__.copy()
+        state.pop('executor', None)
+        state.pop('_limiters', None)
+        return state
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# TextAugment: columnar data
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module augments a text column of Arrow record batches, Parquet files and pandas DataFrames batch by batch.
+"""
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for Arrow and Parquet data
+    pa = pq = None
+
+try:
+    import pandas as pd
+except ImportError:  # pandas is only needed for DataFrames
+    pd = None
+
+
+class Columnar:
+    """
+    Augment the text column of tabular data one batch at a time, so that memory is bounded by the batch size. The
+    other columns (e.g. labels and ids) are carried through, repeated for each variant. Null texts are kept as null.
+
+    Example usage: ::
+        >>> from textaugment import EDA, AEDA
+        >>> from textaugment.columnar import Columnar
+        >>> c = Columnar(EDA().random_swap, column='text', n_variants=2)
+        >>> c.augment_parquet('train.parquet', 'train_augmented.parquet', batch_size=4096)
+        200000
+        >>> c = Columnar(AEDA())  # Augmenters with augment_batch augment the whole column at once
+        >>> for chunk in c.augment_batches(pd.read_csv('train.csv', chunksize=4096)):
+        ...     chunk.to_csv('train_augmented.csv', mode='a', header=False)
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'augment' in kwargs:
+            if not callable(kwargs['augment']) and not hasattr(kwargs['augment'], 'augment_batch'):
+                raise TypeError("augment must be callable or have an augment_batch method")
+        if 'column' in kwargs:
+            if not isinstance(kwargs['column'], str):
+                raise TypeError("column must be a string. Found " + str(type(kwargs['column'])))
+        if 'n_variants' in kwargs:
+            if not isinstance(kwargs['n_variants'], int) or kwargs['n_variants'] < 1:
+                raise TypeError("n_variants must be a positive integer")
+        if 'batch_size' in kwargs:
+            if not isinstance(kwargs['batch_size'], int) or kwargs['batch_size'] < 1:
+                raise TypeError("batch_size must be a positive integer")
+
+    def __init__(self, augment, column='text', n_variants=1, dedup=None):
+        """A method to initialize parameters
+
+        :type augment: callable
+        :param augment: Augments a sentence (e.g. EDA().random_swap or Pipeline.augment), or an augmenter with an
+                augment_batch method (e.g. AEDA())
+        :type column: str
+        :param column: (optional) Name of the text column
+        :type n_variants: int
+        :param n_variants: (optional) Number of augmented rows per row
+        :type dedup: textaugment.dedup.Deduplicator
+        :param dedup: (optional) Drops variants that are duplicates of their source or of each other, so rows can have
+                fewer than n_variants augmented rows
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(augment=augment, column=column, n_variants=n_variants)
+        self.augment = augment
+        self.column = column
+        self.n_variants = n_variants
+        self.dedup = dedup
+
+    def augment_texts(self, texts):
+        """
+        Augment a list of texts. Nulls and empty texts are repeated unchanged.
+
+        :type texts: list
+        :param texts: Texts of a column, possibly None
+        :rtype:   list
+        :return:  List of variants per text
+        """
+        rows = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+        augmented = [[text] * self.n_variants for text in texts]  # Nulls and empty texts are kept
+        if not rows:
+            return augmented
+        batch = getattr(self.augment, 'augment_batch', None)
+        if batch is not None:
+            variants = batch([texts[i] for i in rows], n_variants=self.n_variants)
+        else:
+            variants = [[self.augment(texts[i]) for _ in range(self.n_variants)] for i in rows]
+        for i, texts_ in zip(rows, variants):
+            augmented[i] = texts_ if self.dedup is None else self.dedup.filter(texts[i], texts_)
+        return augmented
+
+    def augment_batch(self, batch):
+        """
+        Augment the text column of one batch.
+
+        :type batch: pyarrow.RecordBatch or pyarrow.Table or pandas.DataFrame
+        :param batch: Batch of rows
+        :rtype:   pyarrow.RecordBatch or pyarrow.Table or pandas.DataFrame
+        :return:  Batch of the same type with n_variants rows per row
+        """
+        if pd is not None and isinstance(batch, pd.DataFrame):
+            variants = self.augment_texts(batch[self.column].tolist())
+            out = batch.iloc[self._repeat(variants)].copy()
+            out[self.column] = [text for texts in variants for text in texts]
+            return out
+        if pa is not None and isinstance(batch, (pa.RecordBatch, pa.Table)):
+            index = batch.schema.get_field_index(self.column)
+            if index < 0:
+                raise KeyError(self.column)
+            variants = self.augment_texts(batch.column(index).to_pylist())
+            out = batch.take(pa.array(self._repeat(variants)))
+            columns = [out.column(i) for i in range(out.num_columns)]
+            columns[index] = pa.array([text for texts in variants for text in texts],
+                                      type=batch.schema.field(index).type)
+            if isinstance(batch, pa.Table):
+                return pa.Table.from_arrays(columns, schema=out.schema)
+            return pa.RecordBatch.from_arrays(columns, schema=out.schema)
+        raise TypeError("batch must be a pyarrow RecordBatch or Table, or a pandas DataFrame. Found "
+                        + str(type(batch)))
+
+    @staticmethod
+    def _repeat(variants):
+        """Index of the source row of each output row"""
+        return np.repeat(np.arange(len(variants)), [len(texts) for texts in variants])
+
+    def augment_batches(self, data, batch_size=1024):
+        """
+        Augment the text column of data batch by batch. Nothing is read before it is needed.
+
+        :type data: pyarrow.Table or pandas.DataFrame or iterable
+        :param data: A table or DataFrame, split in batches of batch_size rows, or an iterable of batches (e.g. a
+                pyarrow.RecordBatchReader or pandas.read_csv(..., chunksize=n))
+        :type batch_size: int
+        :param batch_size: (optional) Number of rows per batch for tables and DataFrames
+        :rtype:   generator
+        :return:  Augmented batches
+        """
+        self.validate(batch_size=batch_size)
+        if pa is not None and isinstance(data, pa.Table):
+            data = data.to_batches(max_chunksize=batch_size)
+        elif pd is not None and isinstance(data, pd.DataFrame):
+            frame = data
+            data = (frame.iloc[start:start + batch_size] for start in range(0, len(frame), batch_size))
+        for batch in data:
+            yield self.augment_batch(batch)
+
+    def augment_parquet(self, source, destination, batch_size=1024, columns=None, compression='snappy'):
+        """
+        Augment the text column of a Parquet file into another Parquet file, writing each batch as it is augmented.
+
+        :type source: str
+        :param source: Path or file object of the Parquet file to read
+        :type destination: str
+        :param destination: Path or file object of the Parquet file to write
+        :type batch_size: int
+        :param batch_size: (optional) Number of rows read at a time
+        :type columns: list
+        :param columns: (optional) Columns to read, all by default
+        :type compression: str
+        :param compression: (optional) Compression of the output
+        :rtype:   int
+        :return:  Number of rows written
+        """
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet files. Install it with: pip install pyarrow")
+        self.validate(batch_size=batch_size)
+        parquet = pq.ParquetFile(source)
+        schema = parquet.schema_arrow
+        if columns is not None:
+            schema = pa.schema([schema.field(name) for name in columns])
+        rows = 0
+        with pq.ParquetWriter(destination, schema, compression=compression) as writer:
+            for batch in self.augment_batches(parquet.iter_batches(batch_size=batch_size, columns=columns)):
+                writer.write_table(pa.Table.from_batches([batch]))
+                rows += batch.num_rows
+        return rows
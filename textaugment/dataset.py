@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# TextAugment: dataset
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module augments examples on the fly while a training data loader iterates over them.
+"""
+import os
+import random
+import numpy as np
+from .columnar import Columnar
+from .mixup import MIXUP
+
+try:
+    from torch.utils.data import IterableDataset, get_worker_info
+except ImportError:  # torch is only needed to use the dataset in a DataLoader
+    IterableDataset = object
+    get_worker_info = None
+
+
+class AugmentedDataset(IterableDataset):
+    """
+    An iterable dataset yielding augmented examples lazily. It is a torch IterableDataset when torch is installed, and
+    a plain iterable otherwise.
+
+    Examples are sentences, or tuples whose first item is the sentence (e.g. (sentence, label)); the other items are
+    kept. With a MIXUP augmenter, examples are feature batches x or (x, y) and the output of mixup_data is yielded.
+    Examples are split between the data loader workers (and the processes of distributed training with rank and
+    world_size) and each worker seeds the random state from (seed, epoch, worker). Examples are read and augmented
+    buffer_size at a time, so augmenters with augment_batch (e.g. AEDA) augment a whole buffer at once.
+
+    Example usage: ::
+        >>> from torch.utils.data import DataLoader
+        >>> from textaugment import EDA
+        >>> from textaugment.dataset import AugmentedDataset
+        >>> dataset = AugmentedDataset(list(zip(sentences, labels)), EDA().random_swap, keep_original=True)
+        >>> loader = DataLoader(dataset, batch_size=32, num_workers=4)
+        >>> for epoch in range(10):
+        ...     dataset.set_epoch(epoch)
+        ...     for batch in loader:
+        ...         pass
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'buffer_size' in kwargs:
+            if not isinstance(kwargs['buffer_size'], int) or kwargs['buffer_size'] < 1:
+                raise TypeError("buffer_size must be a positive integer")
+        if 'seed' in kwargs:
+            if not isinstance(kwargs['seed'], int):
+                raise TypeError("seed must have type int")
+        if 'rank' in kwargs and 'world_size' in kwargs:
+            if not isinstance(kwargs['world_size'], int) or kwargs['world_size'] < 1:
+                raise TypeError("world_size must be a positive integer")
+            if not isinstance(kwargs['rank'], int) or not 0 <= kwargs['rank'] < kwargs['world_size']:
+                raise TypeError("rank must be an integer from 0 to world_size - 1")
+
+    def __init__(self, data, augment, n_variants=1, keep_original=False, buffer_size=32, seed=1, alpha=0.2, rank=0,
+                 world_size=1):
+        """A method to initialize parameters
+
+        :type data: list or str or callable
+        :param data: Sequence of examples, path of a file with one sentence per line, or a callable returning an
+                iterator over the examples
+        :type augment: callable
+        :param augment: Augments a sentence (e.g. EDA().random_swap or Pipeline.augment), an augmenter with an
+                augment_batch method (e.g. AEDA()), or a MIXUP
+        :type n_variants: int
+        :param n_variants: (optional) Number of augmented examples per example
+        :type keep_original: bool
+        :param keep_original: (optional) Also yield each example before its variants
+        :type buffer_size: int
+        :param buffer_size: (optional) Number of examples read ahead and augmented together
+        :type seed: int
+        :param seed: (optional) Seed, the seed of each worker and epoch is derived from it
+        :type alpha: float
+        :param alpha: (optional) alpha of MIXUP
+        :type rank: int
+        :param rank: (optional) Rank of the process in distributed training
+        :type world_size: int
+        :param world_size: (optional) Number of processes in distributed training
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(buffer_size=buffer_size, seed=seed, rank=rank, world_size=world_size)
+        self.data = data
+        self.augment = augment
+        self.mixup = isinstance(augment, MIXUP)
+        self.columnar = None if self.mixup else Columnar(augment, n_variants=n_variants)
+        self.keep_original = keep_original
+        self.buffer_size = buffer_size
+        self.seed = seed
+        self.alpha = alpha
+        self.rank = rank
+        self.world_size = world_size
+        self.epoch = 0
+
+    def set_epoch(self, epoch):
+        """Set the epoch, so that each epoch gets other random variants"""
+        self.epoch = epoch
+
+    def _shard(self):
+        """Index of this worker among all the workers, and number of workers"""
+        info = get_worker_info() if get_worker_info is not None else None
+        worker, num_workers = (0, 1) if info is None else (info.id, info.num_workers)
+        return self.rank * num_workers + worker, self.world_size * num_workers
+
+    def _examples(self, shard, num_shards):
+        """Examples of the shard"""
+        if isinstance(self.data, (str, os.PathLike)):
+            with open(self.data, encoding='utf-8') as f:
+                for i, line in enumerate(f):
+                    if i % num_shards == shard:
+                        yield line.rstrip('\r\n')
+        elif callable(self.data):
+            for i, example in enumerate(self.data()):
+                if i % num_shards == shard:
+                    yield example
+        else:
+            for i in range(shard, len(self.data), num_shards):
+                yield self.data[i]
+
+    def _augment(self, buffer):
+        """Augmented examples of a buffer"""
+        if self.mixup:
+            for example in buffer:
+                if self.keep_original:
+                    yield example
+                yield self.augment.mixup_data(*(example if isinstance(example, tuple) else (example,)),
+                                              alpha=self.alpha)
+            return
+        texts = [example if isinstance(example, str) else example[0] for example in buffer]
+        for example, variants in zip(buffer, self.columnar.augment_texts(texts)):
+            if self.keep_original:
+                yield example
+            for variant in variants:
+                yield variant if isinstance(example, str) else (variant,) + tuple(example[1:])
+
+    def __iter__(self):
+        shard, num_shards = self._shard()
+        seed = int(np.random.SeedSequence([self.seed, self.epoch, shard]).generate_state(1)[0])
+        random.seed(seed)
+        np.random.seed(seed)
+        buffer = list()
+        for example in self._examples(shard, num_shards):
+            buffer.append(example)
+            if len(buffer) == self.buffer_size:
+                yield from self._augment(buffer)
+                buffer = list()
+        yield from self._augment(buffer)
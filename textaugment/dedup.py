@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# TextAugment: near-duplicate filter
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module drops augmented sentences that are equal or too similar to their source or to each other.
+"""
+import threading
+import zlib
+import numpy as np
+
+_PRIME = (1 << 31) - 1  # Hash values are below 2^31, so (a * h + b) fits in 64 bits
+
+
+class Deduplicator:
+    """
+    Drop variants of a sentence that are exact duplicates (same tokens, ignoring case and spaces) or near duplicates
+    of the source or of the variants kept before them. Near duplicates are found with MinHash over token shingles and
+    locality sensitive hashing, with an estimated Jaccard similarity of at least threshold.
+
+    Example usage: ::
+        >>> from textaugment import EDA
+        >>> from textaugment.dedup import Deduplicator
+        >>> t = EDA()
+        >>> d = Deduplicator(threshold=0.8)
+        >>> source = "John is going to town"
+        >>> d.filter(source, [t.random_swap(source) for _ in range(4)])
+        ['John town going to is', 'going is John to town']
+        >>> d.stats
+        {'kept': 2, 'exact': 1, 'near': 1}
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'threshold' in kwargs:
+            if not isinstance(kwargs['threshold'], float) or not 0 < kwargs['threshold'] <= 1:
+                raise TypeError("threshold must be a float between 0 and 1")
+        if 'num_perm' in kwargs:
+            if not isinstance(kwargs['num_perm'], int) or kwargs['num_perm'] < 1:
+                raise TypeError("num_perm must be a positive integer")
+        if 'shingle_size' in kwargs:
+            if not isinstance(kwargs['shingle_size'], int) or kwargs['shingle_size'] < 1:
+                raise TypeError("shingle_size must be a positive integer")
+        if 'random_state' in kwargs:
+            if not isinstance(kwargs['random_state'], int):
+                raise TypeError("random_state must have type int")
+
+    def __init__(self, threshold=0.8, num_perm=64, shingle_size=2, random_state=1):
+        """A method to initialize parameters
+
+        :type threshold: float
+        :param threshold: (optional) Estimated Jaccard similarity of the shingles from which a variant is dropped
+        :type num_perm: int
+        :param num_perm: (optional) Number of hash functions of the MinHash signatures
+        :type shingle_size: int
+        :param shingle_size: (optional) Number of tokens per shingle
+        :type random_state: int
+        :param random_state: (optional) Seed of the hash functions
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(threshold=threshold, num_perm=num_perm, shingle_size=shingle_size, random_state=random_state)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.random_state = random_state
+        rng = np.random.RandomState(random_state)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)[:, None]
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)[:, None]
+        self.bands, self.rows = self._bands(threshold, num_perm)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bands(threshold, num_perm):
+        """Number of bands and rows per band whose LSH threshold (1 / bands) ** (1 / rows) is closest to threshold"""
+        options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+        return min(options, key=lambda option: abs((1 / option[0]) ** (1 / option[1]) - threshold))
+
+    def reset(self):
+        """Clear the counters"""
+        with self._lock:
+            self._stats = {'kept': 0, 'exact': 0, 'near': 0}
+
+    @property
+    def stats(self):
+        """Number of variants kept and dropped as exact or near duplicates"""
+        with self._lock:
+            return dict(self._stats)
+
+    @staticmethod
+    def _normalize(text):
+        """Lower case tokens"""
+        return text.lower().split()
+
+    def signature(self, text):
+        """
+        MinHash signature of the token shingles of a text.
+
+        :type text: str
+        :param text: Input text
+        :rtype:   ndarray
+        :return:  num_perm minimum hash values
+        """
+        tokens = self._normalize(text)
+        k = self.shingle_size
+        shingles = set(" ".join(tokens[i:i + k]) for i in range(max(1, len(tokens) - k + 1)))
+        hashes = np.array([zlib.crc32(shingle.encode('utf-8')) & _PRIME for shingle in shingles], dtype=np.uint64)
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def filter(self, source, variants):
+        """
+        Keep the variants that are not duplicates of the source or of the variants kept before them.
+
+        :type source: str
+        :param source: The sentence the variants were generated from
+        :type variants: list
+        :param variants: Augmented sentences
+        :rtype:   list
+        :return:  Variants kept, in order
+        """
+        exact = {" ".join(self._normalize(source))}
+        signatures = [self.signature(source)]
+        buckets = dict()
+        self._index(buckets, signatures[0], 0)
+        kept = list()
+        counts = {'kept': 0, 'exact': 0, 'near': 0}
+        for variant in variants:
+            key = " ".join(self._normalize(variant))
+            if key in exact:
+                counts['exact'] += 1
+                continue
+            signature = self.signature(variant)
+            candidates = set()
+            for band in range(self.bands):
+                candidates.update(buckets.get(self._band(signature, band), ()))
+            if any(np.mean(signatures[i] == signature) >= self.threshold for i in candidates):
+                counts['near'] += 1
+                continue
+            exact.add(key)
+            self._index(buckets, signature, len(signatures))
+            signatures.append(signature)
+            kept.append(variant)
+            counts['kept'] += 1
+        with self._lock:
+            for name, count in counts.items():
+                self._stats[name] += count
+        return kept
+
+    def _band(self, signature, band):
+        """Bucket key of a band of the signature"""
+        return band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _index(self, buckets, signature, i):
+        """Add the signature number i to the LSH buckets"""
+        for band in range(self.bands):
+            buckets.setdefault(self._band(signature, band), []).append(i)
@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+# TextAugment: distributed runner
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module spreads the shards of a corpus runner over workers on several machines sharing a directory.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from .runner import Runner, atomic_write
+
+
+class FileLeaseQueue:
+    """
+    A queue of shards in a directory shared by the coordinator and the workers (e.g. over NFS). A worker takes a shard
+    by creating its lease file, which fails if another worker holds it, and keeps the lease alive with heartbeats
+    that touch the file. A lease without heartbeat for lease_timeout seconds is expired and its shard is queued
+    again. Another queue (e.g. over TCP) can be used by the Coordinator and the Worker if it has the same methods.
+
+    Example usage: ::
+        >>> from textaugment.distributed import FileLeaseQueue
+        >>> q = FileLeaseQueue('/shared/job/queue', lease_timeout=60)
+        >>> q.plan('/shared/corpus.txt', shard_size=1000)
+        >>> q.acquire('worker-1')
+        {'shard': 0, 'offset': 0, 'lines': 1000, 'source': '/shared/corpus.txt'}
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'lease_timeout' in kwargs:
+            if not isinstance(kwargs['lease_timeout'], (int, float)) or kwargs['lease_timeout'] <= 0:
+                raise TypeError("lease_timeout must be a positive number")
+
+    def __init__(self, directory, lease_timeout=60.0):
+        """A method to initialize parameters
+
+        :type directory: str
+        :param directory: Shared directory of the queue
+        :type lease_timeout: float
+        :param lease_timeout: (optional) Seconds without heartbeat after which a shard is queued again
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(lease_timeout=lease_timeout)
+        self.directory = os.fspath(directory)
+        self.lease_timeout = lease_timeout
+        self.requeued = 0
+
+    @property
+    def tasks_path(self):
+        """Path of the list of shards"""
+        return os.path.join(self.directory, 'tasks.json')
+
+    def _path(self, kind, shard):
+        return os.path.join(self.directory, '{}-{:06d}'.format(kind, shard))
+
+    def plan(self, source, shard_size):
+        """
+        Split the source in shards of shard_size lines and queue them, unless an earlier plan exists.
+
+        :type source: str
+        :param source: Path of the corpus, one sentence per line, readable by all the workers
+        :type shard_size: int
+        :param shard_size: Number of lines per shard
+        :rtype:   list
+        :return:  The shards
+        """
+        if os.path.exists(self.tasks_path):
+            return self.tasks()
+        os.makedirs(self.directory, exist_ok=True)
+        source = os.path.abspath(source)
+        tasks = list()
+        offset = 0
+        for shard, lines, next_offset in Runner.read_shards(source, shard_size):
+            tasks.append({'shard': shard, 'offset': offset, 'lines': len(lines), 'source': source})
+            offset = next_offset
+        atomic_write(self.tasks_path, json.dumps(tasks).encode('utf-8'))
+        return tasks
+
+    def tasks(self):
+        """The planned shards, or None if they are not planned yet"""
+        try:
+            with open(self.tasks_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def done(self, shard):
+        """Whether the shard is completed"""
+        return os.path.exists(self._path('done', shard))
+
+    def finished(self):
+        """Whether all the shards are completed"""
+        tasks = self.tasks()
+        return tasks is not None and all(self.done(task['shard']) for task in tasks)
+
+    def _expired(self, path):
+        """Whether the lease at path has no heartbeat for lease_timeout seconds"""
+        try:
+            return time.time() - os.stat(path).st_mtime > self.lease_timeout
+        except FileNotFoundError:
+            return False
+
+    def _expire(self, shard):
+        """Remove an expired lease. Only one of the processes expiring the same lease succeeds."""
+        lease = self._path('lease', shard)
+        try:
+            os.rename(lease, '{}.expired-{}-{}'.format(lease, socket.gethostname(), os.getpid()))
+        except FileNotFoundError:
+            return False
+        self.requeued += 1
+        return True
+
+    def requeue_expired(self):
+        """
+        Queue the shards of expired leases again.
+
+        :rtype:   int
+        :return:  Number of shards queued again
+        """
+        count = 0
+        for task in self.tasks() or []:
+            shard = task['shard']
+            if not self.done(shard) and self._expired(self._path('lease', shard)) and self._expire(shard):
+                count += 1
+        return count
+
+    def acquire(self, worker):
+        """
+        Take the first shard that is neither completed nor leased.
+
+        :type worker: str
+        :param worker: Name of the worker, written in the lease
+        :rtype:   dict
+        :return:  The shard, or None if all shards are completed or leased
+        """
+        for task in self.tasks() or []:
+            shard = task['shard']
+            if self.done(shard):
+                continue
+            lease = self._path('lease', shard)
+            if self._expired(lease):
+                self._expire(shard)
+            try:
+                fd = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(worker)
+            if self.done(shard):  # Completed by a worker whose lease had expired
+                self.release(shard)
+                continue
+            return task
+        return None
+
+    def heartbeat(self, shard):
+        """Keep the lease of the shard alive"""
+        try:
+            os.utime(self._path('lease', shard))
+        except FileNotFoundError:
+            pass  # The lease expired, the shard is also done by another worker
+
+    def release(self, shard):
+        """Give up the lease of the shard"""
+        try:
+            os.remove(self._path('lease', shard))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, shard):
+        """Mark the shard as completed and release its lease"""
+        atomic_write(self._path('done', shard), b'')
+        self.release(shard)
+
+
+class _Heartbeat:
+    """Context manager sending heartbeats of a shard from a thread"""
+
+    def __init__(self, queue, shard, interval):
+        self.queue = queue
+        self.shard = shard
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="textaugment-heartbeat", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.queue.heartbeat(self.shard)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+class Worker:
+    """
+    Augment the shards handed out by a queue with a Runner. A shard gives the same output whichever worker augments
+    it, since the random state is seeded per shard.
+
+    Example usage: ::
+        >>> from textaugment import EDA
+        >>> from textaugment.runner import Runner
+        >>> from textaugment.distributed import FileLeaseQueue, Worker
+        >>> runner = Runner(EDA().random_swap, '/shared/job/out', shard_size=1000)
+        >>> Worker(runner, FileLeaseQueue('/shared/job/queue')).run()
+        7
+    """
+
+    def __init__(self, runner, queue, name=None, poll=1.0):
+        """A method to initialize parameters
+
+        :type runner: textaugment.runner.Runner
+        :param runner: Augments and commits the shards
+        :type queue: FileLeaseQueue
+        :param queue: Queue of the shards
+        :type name: str
+        :param name: (optional) Name of the worker, host and process id by default
+        :type poll: float
+        :param poll: (optional) Seconds between checks of the queue when all the shards are leased
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.runner = runner
+        self.queue = queue
+        self.name = name if name is not None else "{}-{}".format(socket.gethostname(), os.getpid())
+        self.poll = poll
+
+    def run(self, max_shards=None):
+        """
+        Augment shards until all of them are completed.
+
+        :type max_shards: int
+        :param max_shards: (optional) Stop after this number of shards
+        :rtype:   int
+        :return:  Number of shards augmented by this worker
+        """
+        count = 0
+        os.makedirs(self.runner.output_dir, exist_ok=True)
+        while max_shards is None or count < max_shards:
+            task = self.queue.acquire(self.name)
+            if task is None:
+                if self.queue.finished():
+                    break
+                time.sleep(self.poll)  # Wait for the plan, or for leases of lost workers to expire
+                continue
+            with _Heartbeat(self.queue, task['shard'], self.queue.lease_timeout / 3):
+                _, lines, _ = next(Runner.read_shards(task['source'], task['lines'], task['offset'], task['shard']))
+                self.runner.commit_shard(task['shard'], self.runner.augment_shard(task['shard'], lines))
+            self.queue.complete(task['shard'])
+            count += 1
+        return count
+
+
+class Coordinator:
+    """
+    Plan the shards of a corpus, queue again the shards of workers that stopped sending heartbeats, and merge the
+    output in order once all the shards are completed.
+
+    Example usage: ::
+        >>> from textaugment.distributed import Coordinator, FileLeaseQueue
+        >>> c = Coordinator(runner, FileLeaseQueue('/shared/job/queue'))
+        >>> c.run('/shared/corpus.txt', '/shared/corpus_augmented.txt')
+        {'shards': 12, 'requeued': 1}
+    """
+
+    def __init__(self, runner, queue, poll=1.0):
+        """A method to initialize parameters
+
+        :type runner: textaugment.runner.Runner
+        :param runner: Runner of the workers, gives the shard size and the output directory
+        :type queue: FileLeaseQueue
+        :param queue: Queue of the shards
+        :type poll: float
+        :param poll: (optional) Seconds between checks of the queue
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.runner = runner
+        self.queue = queue
+        self.poll = poll
+
+    def run(self, source, destination=None, timeout=None):
+        """
+        Run the job until all the shards are completed.
+
+        :type source: str
+        :param source: Path of the corpus, one sentence per line
+        :type destination: str
+        :param destination: (optional) Path of the merged output
+        :type timeout: float
+        :param timeout: (optional) Seconds after which a TimeoutError is raised
+        :rtype:   dict
+        :return:  Number of shards, and number of shards queued again
+        """
+        start = time.monotonic()
+        tasks = self.queue.plan(source, self.runner.shard_size)
+        requeued = 0
+        while not self.queue.finished():
+            if timeout is not None and time.monotonic() - start > timeout:
+                raise TimeoutError("shards are not completed after {} seconds".format(timeout))
+            requeued += self.queue.requeue_expired()
+            time.sleep(self.poll)
+        if destination is not None:
+            self.runner.merge(destination)
+        return {'shards': len(tasks), 'requeued': requeued}
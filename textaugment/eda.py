@@ -13,9 +13,16 @@ This module is an implementation of the original EDA algorithm (2019) [1].
 import nltk
 from nltk.corpus import wordnet, stopwords
 import random
+import numpy as np
+from .aio import AsyncMixin
+from .profiling import stage, count_filtered
+from .vocab import VOCABULARY
+from .registry import REGISTRY
+from .tokenizer import get_tokenizer
+from .wordnet import synset_mask
 
 
-class EDA:
+class EDA(AsyncMixin):
     """
     This class is an implementation of the original EDA algorithm (2019) [1].
 
@@ -35,11 +42,13 @@ class EDA:
         John town going to is
         >>> t.random_insertion("John is going to town")
         John is going to make up town
+        >>> await t.augment_async("John is going to town", method='random_swap')
+        John town going to is
     """
 
     @staticmethod
-    def _get_synonyms(word):
-        """Generate synonym"""
+    def _lookup_synonyms(word):
+        """Sorted synonyms of the word from wordnet"""
         synonyms = set()
         for syn in wordnet.synsets(word):
             for lemma in syn.lemmas():
@@ -48,7 +57,27 @@ class EDA:
                 synonyms.add(synonym)
         if word in synonyms:
             synonyms.remove(word)
-        synonyms = sorted(list(synonyms))
+        return sorted(list(synonyms))
+
+    @staticmethod
+    def _get_synonyms(word):
+        """Generate synonym"""
+        synonyms = EDA._lookup_synonyms(word)
+        random.shuffle(synonyms)
+        return synonyms
+
+    def _synonyms(self, word_id):
+        """Shuffled synonyms of the word with the given id, looked up in wordnet once per word"""
+        table = self.vocabulary.table('synonyms')
+        synonyms = table.get(word_id)
+        if synonyms is None:
+            if self.profiler is not None:
+                self.profiler.miss('synonyms')
+            with stage(self.profiler, 'wordnet_lookup'):
+                synonyms = table[word_id] = tuple(self._lookup_synonyms(self.vocabulary.words[word_id]))
+        elif self.profiler is not None:
+            self.profiler.hit('synonyms')
+        synonyms = list(synonyms)
         random.shuffle(synonyms)
         return synonyms
 
@@ -81,42 +110,96 @@ class EDA:
             if not isinstance(kwargs['n'], int):
                 raise TypeError("n must be a valid integer")
 
-    def __init__(self, stop_words=None, random_state=1):
+    def __init__(self, stop_words=None, random_state=1, profiler=None, tokenizer=None):
         """A method to initialize parameters
 
         :type random_state: int
         :param random_state: (optional) Seed
         :type stop_words: list
-        :param stop_words: (optional) List of stopwords
+        :param stop_words: (optional) List of stopwords. By default the english stopwords of nltk, loaded once per
+                process and shared by the EDA instances
+        :type profiler: textaugment.Profiler
+        :param profiler: (optional) Records the time spent in each stage
+        :type tokenizer: textaugment.tokenizer.Tokenizer or bool
+        :param tokenizer: (optional) Splits punctuation from words, True for the default Tokenizer. Synonym
+                replacement then keeps the whitespace, punctuation and casing of the sentence. By default sentences are
+                split on whitespace
 
         :rtype:   None
         :return:  Constructer do not return.
         """
-        self.stopwords = stopwords.words('english') if stop_words is None else stop_words
         self.sentence = None
         self.p = None
         self.n = None
         self.random_state = random_state
+        self.profiler = profiler
+        self.tokenizer = get_tokenizer(tokenizer)
+        self.vocabulary = VOCABULARY
+        if stop_words is None:
+            self.stopwords = REGISTRY.hold(self, ('stopwords', 'english'), lambda: stopwords.words('english'))
+            self._stopword_mask = REGISTRY.hold(self, ('stopword_mask', 'english'), self._build_stopword_mask)
+        else:
+            self.stopwords = stop_words
+            self._stopword_mask = self._build_stopword_mask()
         if isinstance(self.random_state, int):
             random.seed(self.random_state)
         else:
             raise TypeError("random_state must have type int")
 
+    def _build_stopword_mask(self):
+        """Bitmap of the stopwords over the word ids"""
+        return self.vocabulary.bitmap(frozenset(self.stopwords).__contains__)
+
+    def warmup(self):
+        """Load WordNet now instead of on the first call. Call before forking workers so that they share it."""
+        wordnet.ensure_loaded()
+        return self
+
+    def _tokenize(self, sentence):
+        """Split the sentence into words"""
+        with stage(self.profiler, 'tokenize'):
+            if self.tokenizer is None:
+                return sentence.split()
+            return self.tokenizer.tokenize(sentence)
+
+    def _join(self, words, tokens=None):
+        """Join words into a sentence, or put them in place of the tokens they replace"""
+        with stage(self.profiler, 'join'):
+            if self.tokenizer is None:
+                return " ".join(words)
+            if tokens is not None:
+                return self.tokenizer.rebuild(tokens, words)
+            return self.tokenizer.join(words)
+
+    def _augment_sync(self, sentence, method='synonym_replacement', **kwargs):
+        """Run one of the EDA operations, used by augment_async"""
+        if method not in ('synonym_replacement', 'random_deletion', 'random_swap', 'random_insertion'):
+            raise ValueError("method must be one of synonym_replacement, random_deletion, random_swap or "
+                             "random_insertion")
+        return getattr(self, method)(sentence, **kwargs)
+
     def add_word(self, new_words):
         """Insert word"""
-        synonyms = list()
-        counter = 0
-        while len(synonyms) < 1:
-            random_word_list = list([word for word in new_words if word not in self.stopwords])
-            random_word = random_word_list[random.randint(0, len(random_word_list) - 1)]
-            synonyms = self._get_synonyms(random_word)
-            counter += 1
-            if counter >= 10:
-                return new_words  # See Issue 14 for details
-        random_synonym = synonyms[0]  # TODO
-        random_idx = random.randint(0, len(new_words) - 1)
-        new_words.insert(random_idx, random_synonym)
-        return new_words
+        with self.vocabulary.session():
+            synonyms = list()
+            counter = 0
+            ids = self.vocabulary.encode(new_words)
+            random_word_list = ids[~self._stopword_mask[ids]]
+            has_synset = synset_mask(self.vocabulary)[random_word_list]
+            count_filtered(self.profiler, 'synset_index', has_synset)
+            random_word_list = random_word_list[has_synset]  # Words without synsets have no synonyms
+            if len(random_word_list) == 0:
+                return new_words
+            while len(synonyms) < 1:
+                random_word = int(random_word_list[random.randint(0, len(random_word_list) - 1)])
+                synonyms = self._synonyms(random_word)
+                counter += 1
+                if counter >= 10:
+                    return new_words  # See Issue 14 for details
+            random_synonym = synonyms[0]  # TODO
+            random_idx = random.randint(0, len(new_words) - 1)
+            new_words.insert(random_idx, random_synonym)
+            return new_words
 
     # def synonym_replacement_top_n(self,
     #                               sentence: str,
@@ -190,24 +273,33 @@ class EDA:
         self.validate(sentence=sentence, n=n)
         self.n = n
         self.sentence = sentence
-        words = sentence.split()
-        new_words = words.copy()
-        random_word_list = sorted(set([word for word in words if word not in self.stopwords]))
-        random.shuffle(random_word_list)
-        replaced = 0
-        for random_word in random_word_list:
-            synonyms = self._get_synonyms(random_word)
-            if len(synonyms) > 0:
-                synonyms = synonyms[:top_n if top_n else len(synonyms)]  # use top n or all synonyms
-                synonym = random.choice(synonyms)
-                new_words = [synonym if word == random_word else word for word in new_words]
-                replaced += 1
-            if replaced >= self.n:
-                break
-        sentence = ' '.join(new_words)
+        tokens = self._tokenize(sentence)
+        sentence = self._join(self._synonym_replacement(tokens, n=n, top_n=top_n), tokens)
 
         return sentence
 
+    def _synonym_replacement(self, words, n=1, top_n=None):
+        """Replace n words in the list of words with synonyms from wordnet"""
+        with self.vocabulary.session():
+            ids = self.vocabulary.encode(words)
+            candidates = np.unique(ids[~self._stopword_mask[ids]])
+            has_synset = synset_mask(self.vocabulary)[candidates]
+            count_filtered(self.profiler, 'synset_index', has_synset)
+            candidates = candidates[has_synset].tolist()  # Words without synsets have no synonyms
+            random_word_list = sorted(candidates, key=self.vocabulary.words.__getitem__)  # Same order as sorting words
+            random.shuffle(random_word_list)
+            replaced = 0
+            for random_word in random_word_list:
+                synonyms = self._synonyms(random_word)
+                if len(synonyms) > 0:
+                    synonyms = synonyms[:top_n if top_n else len(synonyms)]  # use top n or all synonyms
+                    synonym = random.choice(synonyms)
+                    ids[ids == random_word] = self.vocabulary.intern(synonym)
+                    replaced += 1
+                if replaced >= n:
+                    break
+            return self.vocabulary.decode(ids)
+
     def random_deletion(self, sentence: str, p: float = 0.1):
         """Randomly delete words from the sentence with probability p
 
@@ -222,19 +314,23 @@ class EDA:
         self.validate(sentence=sentence, p=p)
         self.p = p
         self.sentence = sentence
-        words = sentence.split()
+        return self._join(self._random_deletion(self._tokenize(sentence), p=p))
+
+    @staticmethod
+    def _random_deletion(words, p=0.1):
+        """Randomly delete words from the list of words with probability p"""
         if len(words) == 1:
-            return words[0]
+            return words.copy()
         new_words = list()
         for word in words:
             r = random.uniform(0, 1)
-            if r > self.p:
+            if r > p:
                 new_words.append(word)
         # if all words are deleted, just return a random word
         if len(new_words) == 0:
-            return random.choice(words)
+            return [random.choice(words)]
 
-        return " ".join(new_words)
+        return new_words
 
     def random_swap(self, sentence: str, n: int = 1):
         """Randomly swap two words in the sentence n times
@@ -250,11 +346,14 @@ class EDA:
         self.validate(sentence=sentence, n=n)
         self.n = n
         self.sentence = sentence
-        words = sentence.split()
+        return self._join(self._random_swap(self._tokenize(sentence), n=n))
+
+    def _random_swap(self, words, n=1):
+        """Randomly swap two words in the list of words n times"""
         new_words = words.copy()
-        for _ in range(self.n):
+        for _ in range(n):
             new_words = self.swap_word(new_words)
-        return " ".join(new_words)
+        return new_words
 
     def random_insertion(self, sentence: str, n: int = 1):
         """Randomly insert n words into the sentence
@@ -270,8 +369,11 @@ class EDA:
         self.validate(sentence=sentence, n=n)
         self.n = n
         self.sentence = sentence
-        words = sentence.split()
+        return self._join(self._random_insertion(self._tokenize(sentence), n=n))
+
+    def _random_insertion(self, words, n=1):
+        """Randomly insert n words into the list of words"""
         new_words = words.copy()
-        for _ in range(self.n):
+        for _ in range(n):
             new_words = self.add_word(new_words)
-        return " ".join(new_words)
+        return new_words
@@ -7,7 +7,23 @@
 # URL: <https://github.com/dsfsi/textaugment/>
 # For license information, see LICENSE
 import numpy as np
+import os
+import queue
 import random
+import threading
+import time
+
+try:
+    from scipy import sparse
+except ImportError:  # scipy is only needed for sparse inputs
+    sparse = None
+
+
+class _Failure:
+    """An exception raised while producing batches in the background"""
+
+    def __init__(self, error):
+        self.error = error
 
 
 class MIXUP:
@@ -24,15 +40,21 @@ class MIXUP:
         """Validate input data"""
 
         if 'data' in kwargs:
-            if isinstance(kwargs['data'], list):
-                kwargs['data'] = np.array(kwargs['data'])
-            if not isinstance(kwargs['data'], np.ndarray):
-                raise TypeError("data must be numpy array. Found " + str(type(kwargs['data'])))
-        if 'labels' in kwargs:
-            if isinstance(kwargs['labels'], (list, type(None))):
-                kwargs['labels'] = np.array(kwargs['labels'])
-            if not isinstance(kwargs['labels'], np.ndarray):
-                raise TypeError("labels must be numpy array. Found " + str(type(kwargs['labels'])))
+            if not isinstance(kwargs['data'], (list, np.ndarray, str, os.PathLike)) \
+                    and not (hasattr(kwargs['data'], 'shape') and hasattr(kwargs['data'], '__getitem__')):
+                raise TypeError("data must be numpy array, a path to a .npy file or an array-like chunked source. "
+                                "Found " + str(type(kwargs['data'])))
+        if 'labels' in kwargs and kwargs['labels'] is not None:
+            if not isinstance(kwargs['labels'], (list, np.ndarray, str, os.PathLike)) \
+                    and not (hasattr(kwargs['labels'], 'shape') and hasattr(kwargs['labels'], '__getitem__')):
+                raise TypeError("labels must be numpy array, a path to a .npy file or an array-like chunked source. "
+                                "Found " + str(type(kwargs['labels'])))
+        if 'bucket' in kwargs:
+            if not isinstance(kwargs['bucket'], bool):
+                raise TypeError("bucket must be a boolean. Found " + str(type(kwargs['bucket'])))
+        if 'block_size' in kwargs and kwargs['block_size'] is not None:
+            if not isinstance(kwargs['block_size'], int) or kwargs['block_size'] < 1:
+                raise TypeError("block_size must be a positive integer. Found " + str(kwargs['block_size']))
         if 'batch_size' in kwargs:
             if not isinstance(kwargs['batch_size'], int):
                 raise TypeError("batch_size must be a valid integer. Found " + str(type(kwargs['batch_size'])))
@@ -42,87 +64,326 @@ class MIXUP:
         if 'runs' in kwargs:
             if not isinstance(kwargs['runs'], int):
                 raise TypeError("runs must be a valid integer. Found " + str(type(kwargs['runs'])))
+        if 'prefetch' in kwargs:
+            if not isinstance(kwargs['prefetch'], int) or kwargs['prefetch'] < 0:
+                raise TypeError("prefetch must be a non-negative integer. Found " + str(kwargs['prefetch']))
+        if 'reuse_buffers' in kwargs:
+            if not isinstance(kwargs['reuse_buffers'], bool):
+                raise TypeError("reuse_buffers must be a boolean. Found " + str(type(kwargs['reuse_buffers'])))
 
     def __init__(self, random_state=1, runs=1):
         self.random_state = random_state
         self.runs = runs
+        self.prefetch_stats = dict()
         if isinstance(self.random_state, int):
             random.seed(self.random_state)
             np.random.seed(self.random_state)
         else:
             raise TypeError("random_state must have type int")
 
-    def mixup_data(self, x, y=None, alpha=0.2):
+    @staticmethod
+    def _issparse(x):
+        """Check if x is a scipy sparse matrix"""
+        return sparse is not None and sparse.issparse(x)
+
+    @staticmethod
+    def _source(data):
+        """Open data given as a list or a path. Arrays and chunked sources are used as they are."""
+        if isinstance(data, (str, os.PathLike)):
+            return np.load(data, mmap_mode='r')  # Rows are read from disk as they are needed
+        if isinstance(data, list):
+            return np.array(data)
+        return data
+
+    @staticmethod
+    def _buffer(pool, key, shape, dtype):
+        """Return a buffer of the given shape from the pool. Buffers are flat so that any shape fits, they grow but
+        are never shrunk."""
+        size = int(np.prod(shape, dtype=np.int64))
+        buf = pool.get(key)
+        if buf is None or buf.dtype != dtype or buf.size < size:
+            buf = pool[key] = np.empty(size, dtype=dtype)
+        return buf[:size].reshape(shape)
+
+    @staticmethod
+    def _lengths(lengths=None, mask=None):
+        """Sequence lengths from lengths or an attention mask"""
+        if mask is not None:
+            return np.asarray(mask).sum(axis=1).astype(np.int64)
+        if lengths is not None:
+            return np.asarray(lengths, dtype=np.int64)
+        return None
+
+    def mixup_data(self, x, y=None, alpha=0.2, out=None, lengths=None, mask=None):
         """This method performs mixup. If runs = 1 it just does 1 mixup with whole batch, any n of runs
-        creates many mixup matches.
+        creates many mixup matches. All runs are mixed at once and stacked along the first axis.
 
-        :type x: Numpy array
-        :param x: Data array
-        :type y: Numpy array
+        :type x: Numpy array or scipy sparse matrix
+        :param x: Data array. Sparse inputs (e.g. TF-IDF features) are mixed without densifying and stay sparse.
+        :type y: Numpy array or scipy sparse matrix
         :param y: (optional) labels
         :type alpha: float
         :param alpha: alpha
+        :type out: Numpy array or tuple
+        :param out: (optional) Output array for the mixed inputs, or a tuple of output arrays for the mixed inputs and
+                targets. Each must have runs * len(x) rows. The results are written in place and returned. Ignored for
+                sparse inputs.
+        :type lengths: Numpy array
+        :param lengths: (optional) True lengths of padded sequences when x has shape (batch, sequence, ...). Inputs
+                are only mixed up to the longest sequence and positions past the longer sequence of each pair are
+                zeroed.
+        :type mask: Numpy array
+        :param mask: (optional) Attention mask of shape (batch, sequence), used instead of lengths.
 
         :rtype: tuple
-        :return: Returns mixed inputs, pairs of targets, and lambda
+        :return: Returns mixed inputs, or a tuple of mixed inputs and mixed targets if y is given. When lengths or mask
+                are given, the lengths of the mixed sequences are appended to the output.
         """
         if self.runs is None:
             self.runs = 1
-        output_x = []
-        output_y = []
+        out_x, out_y = out if isinstance(out, tuple) else (out, None)
         batch_size = x.shape[0]
-        for i in range(self.runs):
-            lam_vector = np.random.beta(alpha, alpha, batch_size)
-            index = np.random.permutation(batch_size)
-            mixed_x = (x.T * lam_vector).T + (x[index, :].T * (1.0 - lam_vector)).T
-            output_x.append(mixed_x)
-            if y is None:
-                return np.concatenate(output_x, axis=0)
-            mixed_y = (y.T * lam_vector).T + (y[index].T * (1.0 - lam_vector)).T
-            output_y.append(mixed_y)
-        return np.concatenate(output_x, axis=0), np.concatenate(output_y, axis=0)
-
-    def flow(self, data, labels=None, batch_size=32, shuffle=True, runs=1):
+        lengths = self._lengths(lengths, mask)
+        if lengths is not None:
+            if self._issparse(x) or x.ndim < 3:
+                raise ValueError("lengths and mask need inputs of shape (batch, sequence, ...)")
+            x = x[:, :int(lengths.max(initial=0))]  # Padding past the longest sequence is never mixed
+        # One lambda and one permutation per run and sample
+        lam = np.random.beta(alpha, alpha, (self.runs, batch_size))
+        index = np.argsort(np.random.random((self.runs, batch_size)), axis=1)
+        mixed_x = self._mix(x, lam, index, out=out_x)
+        output = (mixed_x,)
+        if y is not None:
+            output += (self._mix(y, lam, index, out=out_y),)
+        if lengths is not None:
+            # A mixed sequence is as long as the longer sequence of its pair
+            mixed_lengths = np.maximum(lengths, lengths[index]).ravel()
+            positions = np.arange(x.shape[1]) < mixed_lengths[:, None]
+            np.multiply(mixed_x, positions.reshape(positions.shape + (1,) * (x.ndim - 2)), out=mixed_x)
+            output += (mixed_lengths,)
+        return output[0] if len(output) == 1 else output
+
+    @staticmethod
+    def _mix(x, lam, index, out=None):
+        """Mix x with its permutations for all runs at once"""
+        if MIXUP._issparse(x):
+            return MIXUP._mix_sparse(x, lam, index)
+        return MIXUP._mix_dense(x, lam, index, out=out)
+
+    @staticmethod
+    def _mix_sparse(x, lam, index):
+        """Mix sparse rows. Each output row is a sparse combination of two input rows, so the mix is a product with a
+        (runs * batch, batch) mixing matrix holding lam and 1 - lam."""
+        runs, batch_size = index.shape
+        rows = np.repeat(np.arange(runs * batch_size), 2)
+        cols = np.stack([np.tile(np.arange(batch_size), runs), index.ravel()], axis=1).ravel()
+        weights = np.stack([lam.ravel(), 1.0 - lam.ravel()], axis=1).ravel()
+        weights = weights.astype(np.result_type(x.dtype, np.float32))
+        mixing = sparse.csr_matrix((weights, (rows, cols)), shape=(runs * batch_size, batch_size))  # Sums i == index
+        return sparse.csr_matrix(mixing @ x)
+
+    @staticmethod
+    def _mixed_dtype(dtype):
+        """Floating inputs keep their dtype (e.g. float16), integer inputs are promoted to float"""
+        if np.issubdtype(dtype, np.floating):
+            return np.dtype(dtype)
+        return np.result_type(dtype, np.float32)
+
+    @staticmethod
+    def _mix_dense(x, lam, index, out=None):
+        """Mix x with its permutations for all runs at once. lam * x + (1 - lam) * x[index] is computed as
+        x + (1 - lam) * (x[index] - x) into a single output without temporaries."""
+        x = np.asarray(x)
+        lam = (1.0 - lam).reshape(lam.shape + (1,) * (x.ndim - 1))
+        shape = (index.size,) + x.shape[1:]
+        if out is None:
+            out = np.empty(shape, dtype=MIXUP._mixed_dtype(x.dtype))
+        elif out.shape != shape or not out.flags.c_contiguous:
+            raise ValueError("out must be a contiguous array of shape " + str(shape))
+        mixed = out.reshape(index.shape + x.shape[1:])
+        if mixed.dtype == x.dtype:
+            np.take(x, index, axis=0, out=mixed, mode='clip')  # Gather straight into the output
+        else:
+            mixed[...] = x[index]
+        np.subtract(mixed, x, out=mixed)
+        np.multiply(mixed, lam, out=mixed)
+        np.add(mixed, x, out=mixed)
+        return out
+
+    def _prefetch(self, batches, size):
+        """Produce batches from the generator in a background thread, at most size batches ahead of the consumer"""
+        buffered = queue.Queue(maxsize=size)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    buffered.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def producer():
+            try:
+                for batch in batches:
+                    put(batch)
+                    if stop.is_set():
+                        break
+            except BaseException as e:  # Raised again in the consumer
+                put(_Failure(e))
+            finally:
+                batches.close()
+
+        def consumer():
+            stats = self.prefetch_stats = {'batches': 0, 'wait_time': 0.0, 'max_wait_time': 0.0}
+            thread = threading.Thread(target=producer, name="mixup-prefetch", daemon=True)
+            thread.start()
+            try:
+                while True:
+                    start = time.perf_counter()
+                    batch = buffered.get()
+                    wait = time.perf_counter() - start
+                    if isinstance(batch, _Failure):
+                        raise batch.error
+                    stats['batches'] += 1
+                    stats['wait_time'] += wait
+                    stats['max_wait_time'] = max(stats['max_wait_time'], wait)
+                    yield batch
+            finally:
+                stop.set()
+                thread.join()
+
+        return consumer()
+
+    def flow(self, data, labels=None, batch_size=32, shuffle=True, runs=1, reuse_buffers=False, prefetch=0,
+             block_size=None, lengths=None, bucket=False):
         """This function implements the batch iterator and specifically calls mixup
 
-        :param data: Input data. Numpy ndarray or list of lists.
-        :param labels: Labels. Numpy ndarray or list of lists.
+        :param data: Input data. Numpy ndarray, list of lists, np.memmap, path to a .npy file, scipy sparse matrix, or
+                an array-like chunked source that supports shape and slicing (e.g. h5py or zarr datasets).
+        :param labels: Labels. Same types as data.
         :param batch_size: Int (default: 32).
         :param shuffle: Boolean (default: True).
         :param runs: Int (default: 1). Number of augmentations
+        :param reuse_buffers: Boolean (default: False). Write every batch into arrays pooled by this generator instead
+                of allocating new ones. A yielded batch is overwritten by the next one of the same generator, so copy
+                it if it must be kept.
+        :param prefetch: Int (default: 0). Number of batches to prepare ahead in a background thread. Consumer wait
+                times are recorded in prefetch_stats. Close the generator to stop the thread.
+        :param block_size: Int (default: None). Read the data in contiguous blocks of about block_size rows, rounded
+                up to a multiple of batch_size. Blocks are shuffled, then rows are shuffled within each block, so only
+                one block is held in memory. Used by default for data that is not an in-memory ndarray.
+        :param lengths: Numpy array (default: None). True sequence lengths, or an attention mask of shape
+                (samples, sequence), for padded data of shape (samples, sequence, ...). Batches are cut to their longest
+                sequence and the mixed lengths are yielded as the last item.
+        :param bucket: Boolean (default: False). Group sequences of similar length into the same batches to minimize
+                padding. Requires lengths.
 
         :rtype:   array or tuple
-        :return:  array or tuple of arrays (X_data array, labels array)."""
+        :return:  array or tuple of arrays (X_data array, labels array, lengths array)."""
 
-        self.validate(data=data, labels=labels, batch_size=batch_size, shuffle=shuffle, runs=runs)
+        self.validate(data=data, labels=labels, batch_size=batch_size, shuffle=shuffle, runs=runs,
+                      reuse_buffers=reuse_buffers, prefetch=prefetch, block_size=block_size, bucket=bucket)
 
         self.runs = runs
+        data = self._source(data)
+        if labels is not None:
+            labels = self._source(labels)
+        data_size = data.shape[0]
+        lengths = self._lengths(mask=lengths) if np.ndim(lengths) == 2 else self._lengths(lengths)
+        if lengths is not None and lengths.shape[0] != data_size:
+            raise ValueError("lengths must have one value per sample")
+        if bucket and lengths is None:
+            raise ValueError("bucket requires lengths")
 
-        num_batches_per_epoch = int((len(data) - 1) / batch_size) + 1
+        is_sparse = self._issparse(data)
+        if is_sparse:
+            data = data.tocsr()  # Fast row slicing
+            reuse_buffers = False  # Sparse batches have no fixed size
+        if block_size is None and not is_sparse and (isinstance(data, np.memmap) or not isinstance(data, np.ndarray)):
+            row_bytes = int(np.prod(data.shape[1:], dtype=np.int64)) * np.dtype(data.dtype).itemsize
+            block_size = (64 << 20) // max(row_bytes, 1)  # About 64 MB per block
+        if block_size is not None:
+            block_size = max(1, -(-block_size // batch_size)) * batch_size
 
-        def data_generator():
-            data_size = len(data)
-            while True:
-                # Shuffle the data at each epoch
+        num_batches_per_epoch = int((data_size - 1) / batch_size) + 1
+
+        # Batches waiting in the prefetch queue must not be overwritten, so pooled buffers rotate over enough slots
+        num_slots = prefetch + 2 if prefetch else 1
+        pool = dict()  # Buffers of this generator only, other generators of the instance have their own
+
+        def take(array, indices, key):
+            """Gather a batch, into a pooled buffer if enabled"""
+            if not reuse_buffers or self._issparse(array):
+                return array[indices]
+            buf = self._buffer(pool, key, (len(indices),) + array.shape[1:], array.dtype)
+            return np.take(array, indices, axis=0, out=buf, mode='clip')
+
+        def read(array, start, end, key):
+            """Read a block of rows with one contiguous read"""
+            if self._issparse(array):
+                return array[start: end]
+            if not reuse_buffers:
+                return np.array(array[start: end])
+            buf = self._buffer(pool, key, (end - start,) + array.shape[1:], array.dtype)
+            buf[...] = array[start: end]
+            return buf
+
+        def mix(X, y, L, slot):
+            """Mix a batch, into pooled buffers if enabled"""
+            out = None
+            if reuse_buffers:
+                rows = self.runs * X.shape[0]
+                out = self._buffer(pool, ('mixed_x', slot), (rows,) + X.shape[1:], self._mixed_dtype(X.dtype))
+                if y is not None:
+                    out = (out, self._buffer(pool, ('mixed_y', slot), (rows,) + y.shape[1:],
+                                             self._mixed_dtype(y.dtype)))
+            return self.mixup_data(X, y, out=out, lengths=L)
+
+        def batches(x, y, l, size):
+            """Split rows into batches, shuffling by index permutation"""
+            # Shuffle the indices at each epoch, batches are gathered from the data as they are needed
+            order = np.random.permutation(size) if shuffle else np.arange(size)
+            starts = np.arange(0, size, batch_size)
+            if bucket:
+                # Sort by length within windows of batches, so each batch holds sequences of similar length
+                window = batch_size * 100
+                for start in range(0, size, window):
+                    rows = order[start: start + window]
+                    order[start: start + window] = rows[np.argsort(l[rows], kind='stable')]
                 if shuffle:
-                    shuffle_indices = np.random.permutation(np.arange(data_size))
-                    shuffled_data = data[shuffle_indices]
-                    if labels is not None:
-                        shuffled_labels = labels[shuffle_indices]
+                    starts = np.random.permutation(starts)
+            for start_index in starts.tolist():
+                end_index = min(start_index + batch_size, size)
+                indices = order[start_index: end_index]
+                L = l[indices] if l is not None else None
+                source = x[:, :int(L.max(initial=0))] if L is not None else x  # Cut padding before gathering
+                if shuffle or bucket:
+                    yield take(source, indices, 'x'), take(y, indices, 'y') if y is not None else None, L
                 else:
-                    shuffled_data = data
-                    if labels is not None:
-                        shuffled_labels = labels
-                for batch_num in range(num_batches_per_epoch):
-                    start_index = batch_num * batch_size
-                    end_index = min((batch_num + 1) * batch_size, data_size)
-                    X = shuffled_data[start_index: end_index]
-                    if labels is None:
-                        X = self.mixup_data(X, y=None)
-                        yield X
-                    else:
-                        y = shuffled_labels[start_index: end_index]
-                        X, y = self.mixup_data(X, y)
-                        yield X, y
+                    yield source[start_index: end_index], y[start_index: end_index] if y is not None else None, L
+
+        def epoch():
+            """Batches of one epoch, read block by block if enabled"""
+            if block_size is None:
+                yield from batches(data, labels, lengths, data_size)
+                return
+            starts = np.arange(0, data_size, block_size)
+            if shuffle:
+                starts = np.random.permutation(starts)
+            for start in starts.tolist():
+                end = min(start + block_size, data_size)
+                x = read(data, start, end, 'block_x')
+                y = read(labels, start, end, 'block_y') if labels is not None else None
+                yield from batches(x, y, lengths[start: end] if lengths is not None else None, end - start)
+
+        def data_generator():
+            slot = 0
+            while True:
+                for X, y, L in epoch():
+                    slot = (slot + 1) % num_slots
+                    yield mix(X, y, L, slot)
 
+        if prefetch:
+            return self._prefetch(data_generator(), prefetch), num_batches_per_epoch
         return data_generator(), num_batches_per_epoch
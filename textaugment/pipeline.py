@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# TextAugment: Pipeline
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module chains augmenters so that a sentence is tokenized once and joined once.
+"""
+import random
+
+
+class Pipeline:
+    """
+    Chain augmenters on a shared list of tokens. The sentence is split once at the start and joined once at the end,
+    each step runs with its own probability.
+
+    A step is a tuple (augmenter, method), (augmenter, method, p) or (augmenter, method, p, kwargs) where method is the
+    name of a public method of the augmenter, p is the probability of running the step and kwargs are passed to the
+    method. Methods without a token level implementation (e.g. Translate.augment) join and split the tokens around the
+    call.
+
+    Example usage: ::
+        >>> from textaugment import EDA, AEDA, Pipeline
+        >>> p = Pipeline([(EDA(), 'random_swap', 0.5, {'n': 2}), (AEDA(), 'punct_insertion')])
+        >>> p.augment("John is going to town")
+        John ? going is to town
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+        if 'sentence' in kwargs:
+            if not isinstance(kwargs['sentence'], str) or len(kwargs['sentence'].strip()) == 0:
+                raise TypeError("sentence must be a valid sentence")
+        if 'steps' in kwargs:
+            if not isinstance(kwargs['steps'], (list, tuple)):
+                raise TypeError("steps must be a list of (augmenter, method, p, kwargs) tuples")
+            for step in kwargs['steps']:
+                if not isinstance(step, tuple) or not 2 <= len(step) <= 4:
+                    raise TypeError("step must be a tuple (augmenter, method, p, kwargs). Found " + str(step))
+                if not isinstance(step[1], str) or not callable(getattr(step[0], step[1], None)):
+                    raise TypeError("method must be the name of a method of the augmenter. Found " + str(step[1]))
+                if len(step) > 2 and (not isinstance(step[2], (int, float)) or not 0 <= step[2] <= 1):
+                    raise TypeError("p must be a fraction between 0 and 1. Found " + str(step[2]))
+                if len(step) > 3 and not isinstance(step[3], dict):
+                    raise TypeError("kwargs must be a dict. Found " + str(type(step[3])))
+
+    def __init__(self, steps, random_state=None):
+        """A method to initialize parameters
+
+        :type steps: list
+        :param steps: List of (augmenter, method, p, kwargs) tuples, p and kwargs are optional
+        :type random_state: int
+        :param random_state: (optional) Seed
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(steps=steps)
+        self.steps = []
+        for step in steps:
+            augmenter, method = step[0], step[1]
+            p = step[2] if len(step) > 2 else 1.0
+            kwargs = step[3] if len(step) > 3 else dict()
+            if hasattr(augmenter, 'validate'):
+                augmenter.validate(**kwargs)  # Token level methods do not validate their arguments
+            self.steps.append((self._resolve(augmenter, method), p, kwargs))
+        self.random_state = random_state
+        if isinstance(self.random_state, int):
+            random.seed(self.random_state)
+        elif self.random_state is not None:
+            raise TypeError("random_state must have type int")
+
+    @staticmethod
+    def _resolve(augmenter, method):
+        """Return the token level implementation of the method, or wrap the string method"""
+        tokens_method = getattr(augmenter, '_' + method, None)
+        if callable(tokens_method):
+            return tokens_method
+        string_method = getattr(augmenter, method)
+
+        def wrapper(words, **kwargs):
+            return string_method(' '.join(words), **kwargs).split()
+        return wrapper
+
+    def augment_tokens(self, words):
+        """Run the steps on a list of tokens
+
+        :type words: list
+        :param words: List of tokens
+
+        :rtype:   list
+        :return:  Augmented list of tokens
+        """
+        for method, p, kwargs in self.steps:
+            if len(words) == 0:
+                break
+            if p >= 1 or random.random() < p:
+                words = method(words, **kwargs)
+        return words
+
+    def augment(self, sentence: str):
+        """Run the steps on a sentence
+
+        :type sentence: str
+        :param sentence: Sentence
+
+        :rtype:   str
+        :return:  Augmented sentence
+        """
+        self.validate(sentence=sentence)
+        return ' '.join(self.augment_tokens(sentence.split()))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# TextAugment: profiling
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module records how often and how long the internal stages of the augmenters run.
+"""
+import threading
+import time
+from contextlib import nullcontext
+import numpy as np
+
+_DISABLED = nullcontext()
+
+
+def stage(profiler, name):
+    """Time a stage with the profiler, or do nothing if the profiler is None"""
+    if profiler is None:
+        return _DISABLED
+    return profiler.stage(name)
+
+
+def count_filtered(profiler, name, passed):
+    """Record the items ruled out by the filter name as hits and the items that passed, and are looked up, as
+    misses. Do nothing if the profiler is None."""
+    if profiler is not None:
+        looked_up = int(np.count_nonzero(passed))
+        profiler.hit(name, len(passed) - looked_up)
+        profiler.miss(name, looked_up)
+
+
+class _Stage:
+    """Context manager timing one stage"""
+
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Count calls and cumulative time of the internal stages of augmenters (e.g. tokenize, pos_tag, wordnet_lookup,
+    embedding_search, translate), and hits and misses of their caches. Profiling is off unless a profiler is given.
+
+    Example usage: ::
+        >>> from textaugment import EDA, Profiler
+        >>> profiler = Profiler()
+        >>> t = EDA(profiler=profiler)
+        >>> t.synonym_replacement("John is going to town")
+        >>> profiler.stats['stages']['wordnet_lookup']
+        {'count': 3, 'time': 0.0021}
+    """
+
+    def __init__(self, callback=None):
+        """A method to initialize parameters
+
+        :type callback: callable
+        :param callback: (optional) Called as callback(stage, seconds) each time a stage ends
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        if callback is not None and not callable(callback):
+            raise TypeError("callback must be callable")
+        self.callback = callback
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Clear all counters"""
+        with self._lock:
+            self._stages = dict()
+            self._caches = dict()
+
+    def stage(self, name):
+        """Return a context manager timing the stage name"""
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        """Add one run of the stage name that took seconds"""
+        with self._lock:
+            counter = self._stages.get(name)
+            if counter is None:
+                counter = self._stages[name] = [0, 0.0]
+            counter[0] += 1
+            counter[1] += seconds
+        if self.callback is not None:
+            self.callback(name, seconds)
+
+    def hit(self, name, n=1):
+        """Record n hits of the cache name"""
+        with self._lock:
+            self._caches.setdefault(name, [0, 0])[0] += n
+
+    def miss(self, name, n=1):
+        """Record n misses of the cache name"""
+        with self._lock:
+            self._caches.setdefault(name, [0, 0])[1] += n
+
+    @property
+    def stats(self):
+        """Counters as a dict of stages (count, time) and caches (hits, misses, hit_rate)"""
+        with self._lock:
+            return {
+                'stages': {name: {'count': count, 'time': seconds}
+                           for name, (count, seconds) in self._stages.items()},
+                'caches': {name: {'hits': hits, 'misses': misses,
+                                  'hit_rate': hits / (hits + misses) if hits + misses else 0.0}
+                           for name, (hits, misses) in self._caches.items()},
+            }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# TextAugment: resource registry
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module loads heavy resources (stopwords, taggers, vector models, neighbour indexes) once per process and shares
+them between augmenters.
+"""
+import threading
+import weakref
+
+
+class _Entry:
+    """A resource and the objects holding it"""
+
+    __slots__ = ('value', 'loaded', 'owners', 'lock')
+
+    def __init__(self):
+        self.value = None
+        self.loaded = False
+        self.owners = weakref.WeakSet()
+        self.lock = threading.Lock()
+
+
+class Registry:
+    """
+    Resources keyed by name and identity (e.g. ('word2vec', path, mmap)), each loaded once by the first augmenter
+    that needs it. Augmenters holding a resource are counted and stop holding it when they are garbage collected.
+    Resources stay loaded until they are evicted, so augmenters created per request reuse them.
+
+    Example usage: ::
+        >>> from textaugment import EDA
+        >>> from textaugment.registry import REGISTRY
+        >>> t1, t2 = EDA(), EDA()  # The stopwords are loaded once
+        >>> REGISTRY.refcount(('stopwords', 'english'))
+        2
+        >>> del t1, t2
+        >>> REGISTRY.evict()  # Evict the resources no augmenter holds
+        2
+    """
+
+    def __init__(self):
+        self._entries = dict()
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def hold(self, owner, key, loader):
+        """
+        Return the resource key, loading it with loader() if it is not loaded, and count owner as holding it.
+
+        :type owner: object
+        :param owner: Object holding the resource, or None to get it without holding it
+        :type key: tuple
+        :param key: Name and identity of the resource
+        :type loader: callable
+        :param loader: Loads the resource. If it raises, nothing is registered
+        :rtype:   object
+        :return:  The resource
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+        with entry.lock:  # Other resources load meanwhile, the same resource is loaded once
+            if not entry.loaded:
+                entry.value = loader()
+                entry.loaded = True
+                with self._lock:
+                    self.loads += 1
+            if owner is not None:
+                entry.owners.add(owner)
+            return entry.value
+
+    def get(self, key, loader):
+        """Return the resource key without holding it, loading it with loader() if it is not loaded"""
+        return self.hold(None, key, loader)
+
+    def release(self, owner, key=None):
+        """Stop counting owner as holding the resource key, or all resources if key is None"""
+        with self._lock:
+            entries = list(self._entries.values()) if key is None else [self._entries.get(key)]
+        for entry in entries:
+            if entry is not None:
+                entry.owners.discard(owner)
+
+    def refcount(self, key):
+        """Number of objects holding the resource key"""
+        entry = self._entries.get(key)
+        return 0 if entry is None else len(entry.owners)
+
+    def evict(self, key=None, force=False):
+        """
+        Unload resources. Augmenters that still hold a resource keep their reference, new augmenters load it again.
+
+        :type key: tuple
+        :param key: (optional) Resource to evict. By default all the resources that no object holds
+        :type force: bool
+        :param force: (optional) Evict key even if objects hold it
+        :rtype:   int
+        :return:  Number of resources evicted
+        """
+        with self._lock:
+            if key is None:
+                keys = [k for k, entry in self._entries.items() if len(entry.owners) == 0]
+            elif key in self._entries and (force or len(self._entries[key].owners) == 0):
+                keys = [key]
+            else:
+                keys = []
+            for k in keys:
+                del self._entries[k]
+            return len(keys)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry.loaded
+
+    def __len__(self):
+        return sum(1 for entry in list(self._entries.values()) if entry.loaded)
+
+    @property
+    def stats(self):
+        """Number of loads, and number of holders of each loaded resource"""
+        with self._lock:
+            return {'loads': self.loads,
+                    'resources': {key: len(entry.owners) for key, entry in self._entries.items() if entry.loaded}}
+
+
+REGISTRY = Registry()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# TextAugment: corpus runner
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module augments a corpus file in shards that are committed atomically, so that a job can resume where it stopped.
+"""
+import json
+import os
+import random
+import shutil
+import uuid
+import numpy as np
+from .columnar import Columnar
+
+
+def shard_seed(seed, shard):
+    """Seed of the random state of a shard, independent of the shards run before it"""
+    return int(np.random.SeedSequence([seed, shard]).generate_state(1)[0])
+
+
+def atomic_write(path, data):
+    """Write bytes to path so that readers see either the old or the new file, never a partial one. Each call writes
+    its own temporary file, so concurrent writers of the same path (e.g. two workers of a shard) do not clobber each
+    other and the last rename wins."""
+    tmp = "{}.{}.tmp".format(path, uuid.uuid4().hex)
+    fd = os.open(tmp, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class Runner:
+    """
+    Augment a corpus with one sentence per line. Lines are read in shards of shard_size lines; the output of a shard
+    is written to a temporary file and renamed into output_dir, then a checkpoint records the shard and the byte
+    offset of the next one. The random state is seeded per shard, so a job that is stopped and run again resumes
+    after the last committed shard and produces the same output as a job that never stopped.
+
+    Example usage: ::
+        >>> from textaugment import Translate
+        >>> from textaugment.runner import Runner
+        >>> r = Runner(Translate(src="en", to="fr").augment, 'out/', shard_size=1000)
+        >>> r.run('corpus.txt')  # Stopped after 3 shards, run again to resume
+        {'shards': 12, 'lines': 11500, 'resumed': 3}
+        >>> r.merge('corpus_augmented.txt')
+    """
+
+    checkpoint_name = 'progress.json'
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'shard_size' in kwargs:
+            if not isinstance(kwargs['shard_size'], int) or kwargs['shard_size'] < 1:
+                raise TypeError("shard_size must be a positive integer")
+        if 'seed' in kwargs:
+            if not isinstance(kwargs['seed'], int):
+                raise TypeError("seed must have type int")
+        if 'output_dir' in kwargs:
+            if not isinstance(kwargs['output_dir'], (str, os.PathLike)):
+                raise TypeError("output_dir must be a path")
+
+    def __init__(self, augment, output_dir, shard_size=10000, n_variants=1, seed=1, dedup=None):
+        """A method to initialize parameters
+
+        :type augment: callable
+        :param augment: Augments a sentence (e.g. EDA().random_swap or Pipeline.augment), or an augmenter with an
+                augment_batch method (e.g. AEDA())
+        :type output_dir: str
+        :param output_dir: Directory of the shards and of the checkpoint
+        :type shard_size: int
+        :param shard_size: (optional) Number of input lines per shard
+        :type n_variants: int
+        :param n_variants: (optional) Number of augmented lines per line
+        :type seed: int
+        :param seed: (optional) Seed of the job, the seed of each shard is derived from it
+        :type dedup: textaugment.dedup.Deduplicator
+        :param dedup: (optional) Drops variants that are duplicates of their line or of each other
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(output_dir=output_dir, shard_size=shard_size, seed=seed)
+        self.columnar = Columnar(augment, n_variants=n_variants, dedup=dedup)
+        self.output_dir = os.fspath(output_dir)
+        self.shard_size = shard_size
+        self.seed = seed
+
+    def shard_path(self, shard):
+        """Path of the output of a shard"""
+        return os.path.join(self.output_dir, 'shard-{:06d}.txt'.format(shard))
+
+    @property
+    def checkpoint_path(self):
+        """Path of the checkpoint"""
+        return os.path.join(self.output_dir, self.checkpoint_name)
+
+    def load_checkpoint(self, source):
+        """The checkpoint of the job on source, or a new one"""
+        checkpoint = {'source': os.path.abspath(source), 'shard_size': self.shard_size, 'seed': self.seed,
+                      'next_shard': 0, 'offset': 0, 'lines': 0, 'done': False}
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                saved = json.load(f)
+            for key in ('source', 'shard_size', 'seed'):
+                if saved[key] != checkpoint[key]:
+                    raise ValueError("output_dir has a checkpoint of another job: {} is {} instead of {}".format(
+                        key, saved[key], checkpoint[key]))
+            checkpoint = saved
+        return checkpoint
+
+    def augment_shard(self, shard, lines):
+        """
+        Augment the lines of a shard with the random state of the shard.
+
+        :type shard: int
+        :param shard: Index of the shard
+        :type lines: list
+        :param lines: Input lines, without line breaks
+        :rtype:   bytes
+        :return:  Augmented lines, one per line
+        """
+        seed = shard_seed(self.seed, shard)
+        random.seed(seed)
+        np.random.seed(seed % (1 << 32))
+        variants = self.columnar.augment_texts(lines)
+        return "".join(text.replace("\n", " ") + "\n" for texts in variants for text in texts).encode('utf-8')
+
+    def commit_shard(self, shard, data):
+        """Write the output of a shard atomically"""
+        atomic_write(self.shard_path(shard), data)
+
+    @staticmethod
+    def read_shards(source, shard_size, offset=0, shard=0):
+        """
+        Read a file in shards of shard_size lines, starting at a byte offset.
+
+        :rtype:   generator
+        :return:  (shard, lines, offset of the next shard)
+        """
+        with open(source, 'rb') as f:
+            f.seek(offset)
+            lines = list()
+            for line in f:
+                offset += len(line)
+                lines.append(line.decode('utf-8').rstrip('\r\n'))
+                if len(lines) == shard_size:
+                    yield shard, lines, offset
+                    shard += 1
+                    lines = list()
+            if lines:
+                yield shard, lines, offset
+
+    def run(self, source):
+        """
+        Augment source, resuming after the shards committed by an earlier run.
+
+        :type source: str
+        :param source: Path of the corpus, one sentence per line
+        :rtype:   dict
+        :return:  Number of shards and lines of the job, and number of shards committed by earlier runs
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        checkpoint = self.load_checkpoint(source)
+        resumed = checkpoint['next_shard']
+        if not checkpoint['done']:
+            for shard, lines, offset in self.read_shards(source, self.shard_size, checkpoint['offset'], resumed):
+                self.commit_shard(shard, self.augment_shard(shard, lines))
+                checkpoint.update(next_shard=shard + 1, offset=offset, lines=checkpoint['lines'] + len(lines))
+                atomic_write(self.checkpoint_path, json.dumps(checkpoint).encode('utf-8'))
+            checkpoint['done'] = True
+            atomic_write(self.checkpoint_path, json.dumps(checkpoint).encode('utf-8'))
+        return {'shards': checkpoint['next_shard'], 'lines': checkpoint['lines'], 'resumed': resumed}
+
+    def merge(self, destination):
+        """
+        Concatenate the committed shards in order.
+
+        :type destination: str
+        :param destination: Path of the merged output
+        """
+        shard = 0
+        with open(destination, 'wb') as out:
+            while os.path.exists(self.shard_path(shard)):
+                with open(self.shard_path(shard), 'rb') as f:
+                    shutil.copyfileobj(f, out)
+                shard += 1
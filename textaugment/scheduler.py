@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# TextAugment: scheduler
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module adapts the number of variants generated by each augmenter to a time budget or a target throughput.
+"""
+import time
+
+
+class Scheduler:
+    """
+    Generate variants of sentences with a mix of augmenters within a time budget (seconds for the whole input) or at
+    a target throughput (input sentences per second). The cost of each augmenter is measured online; for each
+    sentence the time left until its deadline is spent on as many variants as fit, split between the augmenters
+    according to their ratios. Fractions of variants are carried over to the next sentences, so the achieved mix
+    follows the ratios over the run. When the run is behind schedule sentences get no variants until it catches up.
+
+    Example usage: ::
+        >>> from textaugment import AEDA, EDA, Translate
+        >>> from textaugment.scheduler import Scheduler
+        >>> t = Translate(src="en", to="fr")
+        >>> s = Scheduler([(AEDA().punct_insertion, 0.6), (EDA().random_swap, 0.3), (t.augment, 0.1)], budget=600)
+        >>> for sentence, variants in s.run(sentences):
+        ...     pass
+        >>> s.stats['augmenters']['augment']['share']
+        0.097
+    """
+
+    @staticmethod
+    def validate(**kwargs):
+        """Validate input data"""
+
+        if 'mix' in kwargs:
+            if not isinstance(kwargs['mix'], (list, tuple)) or len(kwargs['mix']) == 0:
+                raise TypeError("mix must be a non-empty list of (augment, ratio) or (augment, ratio, name)")
+            for step in kwargs['mix']:
+                if not isinstance(step, tuple) or len(step) not in (2, 3) or not callable(step[0]):
+                    raise TypeError("each step of mix must be (augment, ratio) or (augment, ratio, name)")
+                if not isinstance(step[1], (int, float)) or step[1] <= 0:
+                    raise TypeError("ratio must be a positive number. Found " + str(step[1]))
+        if kwargs.get('budget') is not None:
+            if not isinstance(kwargs['budget'], (int, float)) or kwargs['budget'] <= 0:
+                raise TypeError("budget must be a positive number of seconds")
+        if kwargs.get('rate') is not None:
+            if not isinstance(kwargs['rate'], (int, float)) or kwargs['rate'] <= 0:
+                raise TypeError("rate must be a positive number of sentences per second")
+        if 'max_variants' in kwargs:
+            if not isinstance(kwargs['max_variants'], int) or kwargs['max_variants'] < 1:
+                raise TypeError("max_variants must be a positive integer")
+        if 'alpha' in kwargs:
+            if not isinstance(kwargs['alpha'], float) or not 0 < kwargs['alpha'] <= 1:
+                raise TypeError("alpha must be a float between 0 and 1")
+
+    def __init__(self, mix, budget=None, rate=None, max_variants=10, alpha=0.2, clock=time.perf_counter):
+        """A method to initialize parameters
+
+        :type mix: list
+        :param mix: List of (augment, ratio) or (augment, ratio, name), where augment augments a sentence (e.g.
+                EDA().random_swap) and ratio is its share of the variants
+        :type budget: float
+        :param budget: (optional) Seconds for the whole input, which must have a length or be given a total
+        :type rate: float
+        :param rate: (optional) Target number of input sentences per second
+        :type max_variants: int
+        :param max_variants: (optional) Maximum number of variants per sentence
+        :type alpha: float
+        :param alpha: (optional) Weight of the last call in the moving average of the cost of an augmenter
+        :type clock: callable
+        :param clock: (optional) Returns the time in seconds
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.validate(mix=mix, budget=budget, rate=rate, max_variants=max_variants, alpha=alpha)
+        if (budget is None) == (rate is None):
+            raise TypeError("set one of budget or rate")
+        total = float(sum(step[1] for step in mix))
+        self.names = [step[2] if len(step) == 3 else getattr(step[0], '__name__', str(i)) for i, step in
+                      enumerate(mix)]
+        if len(set(self.names)) != len(self.names):
+            raise TypeError("names of the augmenters must be unique, set them with (augment, ratio, name)")
+        self.augments = [step[0] for step in mix]
+        self.ratios = [step[1] / total for step in mix]
+        self.budget = budget
+        self.rate = rate
+        self.max_variants = max_variants
+        self.alpha = alpha
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        """Clear the costs and the counters"""
+        self.costs = [None] * len(self.augments)
+        self.credits = [0.0] * len(self.augments)
+        self.variants = [0] * len(self.augments)
+        self.times = [0.0] * len(self.augments)
+        self.sentences = 0
+        self.elapsed = 0.0
+
+    def _counts(self, allowance):
+        """Number of variants of each augmenter that fit in allowance seconds"""
+        if None in self.costs:  # Measure augmenters that never ran
+            return [1 if cost is None else 0 for cost in self.costs]
+        unit = sum(ratio * cost for ratio, cost in zip(self.ratios, self.costs))  # Cost of one variant of the mix
+        n = min(max(allowance, 0.0) / unit if unit > 0 else self.max_variants, self.max_variants)
+        counts = list()
+        for i, ratio in enumerate(self.ratios):
+            self.credits[i] += n * ratio
+            counts.append(int(self.credits[i]))
+            self.credits[i] -= counts[-1]
+        return counts
+
+    def _call(self, i, sentence):
+        """Run augmenter i and update its cost"""
+        start = self.clock()
+        variant = self.augments[i](sentence)
+        seconds = self.clock() - start
+        cost = self.costs[i]
+        self.costs[i] = seconds if cost is None else (1 - self.alpha) * cost + self.alpha * seconds
+        self.variants[i] += 1
+        self.times[i] += seconds
+        return variant
+
+    def run(self, sentences, total=None):
+        """
+        Augment sentences within the budget or at the target rate.
+
+        :type sentences: iterable
+        :param sentences: Input sentences
+        :type total: int
+        :param total: (optional) Number of sentences, needed with a budget if sentences has no length
+        :rtype:   generator
+        :return:  (sentence, list of variants)
+        """
+        if self.budget is not None:
+            if total is None:
+                if not hasattr(sentences, '__len__'):
+                    raise TypeError("total must be given with a budget when sentences has no length")
+                total = len(sentences)
+            interval = self.budget / max(total, 1)
+        else:
+            interval = 1.0 / self.rate
+        elapsed = self.elapsed  # Costs and counters carry over from earlier runs, the schedule starts now
+        start = self.clock()
+        for n, sentence in enumerate(sentences):
+            counts = self._counts(start + (n + 1) * interval - self.clock())  # Time left until the deadline
+            variants = [self._call(i, sentence) for i, count in enumerate(counts) for _ in range(count)]
+            self.sentences += 1
+            self.elapsed = elapsed + self.clock() - start
+            yield sentence, variants
+
+    @property
+    def stats(self):
+        """Counters of the run and, per augmenter, variants, time, cost per variant, achieved and target share"""
+        variants = sum(self.variants)
+        return {
+            'sentences': self.sentences,
+            'variants': variants,
+            'elapsed': self.elapsed,
+            'augmenters': {name: {'variants': self.variants[i], 'time': self.times[i], 'cost': self.costs[i],
+                                  'share': self.variants[i] / variants if variants else 0.0,
+                                  'target': self.ratios[i]}
+                           for i, name in enumerate(self.names)},
+        }
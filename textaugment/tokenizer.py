@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# TextAugment: tokenizer
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module splits text into words and punctuation with their offsets, so that augmented words can be put back into
+the original text.
+"""
+import re
+
+_TOKEN = re.compile(r"\w+(?:[-'’]\w+)*|[^\w\s]")
+_ATTACH_LEFT = frozenset(".,!?;:%)]}”’")  # No space before these
+_ATTACH_RIGHT = frozenset("([{“‘")  # No space after these
+
+
+class Tokens(list):
+    """List of tokens with the text they come from and their (start, end) offsets in it"""
+
+    def __init__(self, words, text, spans):
+        super().__init__(words)
+        self.text = text
+        self.spans = spans
+
+
+def match_case(old, new):
+    """Give new the casing of old (upper case or capitalized)"""
+    if len(old) > 1 and old.isupper():
+        return new.upper()
+    if old[:1].isupper():
+        return new[:1].upper() + new[1:]
+    return new
+
+
+class Tokenizer:
+    """
+    Split text into words (with inner hyphens and apostrophes) and punctuation marks in one pass of a precompiled
+    regular expression. Augmenters given a tokenizer find synonyms for words followed by punctuation (e.g. "town.")
+    and, when they replace words, rebuild the original text with its whitespace, punctuation and casing.
+
+    Example usage: ::
+        >>> from textaugment import EDA
+        >>> from textaugment.tokenizer import Tokenizer
+        >>> tokens = Tokenizer().tokenize("John is going to town.")
+        >>> tokens, tokens.spans
+        (['John', 'is', 'going', 'to', 'town', '.'], [(0, 4), (5, 7), (8, 13), (14, 16), (17, 21), (21, 22)])
+        >>> EDA(tokenizer=True).synonym_replacement("John is going to town.")  # The default Tokenizer
+        John is going to township.
+    """
+
+    def __init__(self, pattern=None):
+        """A method to initialize parameters
+
+        :type pattern: str
+        :param pattern: (optional) Regular expression matching a token
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        self.regex = _TOKEN if pattern is None else re.compile(pattern)
+
+    def tokenize(self, text):
+        """
+        Split text into tokens.
+
+        :type text: str
+        :param text: Input text
+        :rtype:   Tokens
+        :return:  List of tokens with their offsets in text
+        """
+        words = list()
+        spans = list()
+        for match in self.regex.finditer(text):
+            words.append(match.group())
+            spans.append(match.span())
+        return Tokens(words, text, spans)
+
+    def join(self, words):
+        """
+        Join tokens with spaces, without spaces before closing and after opening punctuation.
+
+        :type words: list
+        :param words: List of tokens
+        :rtype:   str
+        :return:  Text
+        """
+        parts = list()
+        for i, word in enumerate(words):
+            if i > 0 and word not in _ATTACH_LEFT and words[i - 1] not in _ATTACH_RIGHT:
+                parts.append(" ")
+            parts.append(word)
+        return "".join(parts)
+
+    def rebuild(self, tokens, words):
+        """
+        Put words in place of the tokens they replace in the original text. Words equal to their token ignoring case
+        keep the original, other words get the casing of the token they replace.
+
+        :type tokens: Tokens
+        :param tokens: Tokens of the original text
+        :type words: list
+        :param words: Replacements of the tokens, one per token
+        :rtype:   str
+        :return:  Text
+        """
+        if not isinstance(tokens, Tokens) or len(words) != len(tokens):
+            return self.join(words)  # Tokens were inserted or deleted
+        parts = list()
+        last = 0
+        for (start, end), old, new in zip(tokens.spans, tokens, words):
+            parts.append(tokens.text[last:start])
+            parts.append(old if new.lower() == old.lower() else match_case(old, new))
+            last = end
+        parts.append(tokens.text[last:])
+        return "".join(parts)
+
+
+TOKENIZER = Tokenizer()
+
+
+def get_tokenizer(tokenizer):
+    """The tokenizer argument of an augmenter: the shared TOKENIZER for True, None for None or False, and the given
+    tokenizer otherwise"""
+    if tokenizer is True:
+        return TOKENIZER
+    if tokenizer is None or tokenizer is False:
+        return None
+    if not callable(getattr(tokenizer, 'tokenize', None)):
+        raise TypeError("tokenizer must be a Tokenizer or a bool")
+    return tokenizer
@@ -6,13 +6,19 @@
 # URL: <https://github.com/dsfsi/textaugment/>
 # For license information, see LICENSE
 
+import asyncio
+import inspect
 from .constants import LANGUAGES
 from textblob import TextBlob
 from textblob.translate import NotTranslated
 from googletrans import Translator
+from .aio import AsyncMixin
+from .profiling import stage
 
+GOOGLETRANS_ASYNC = inspect.iscoroutinefunction(Translator.translate)  # googletrans >= 4.0.1 is async
 
-class Translate: 
+
+class Translate(AsyncMixin):
     """
     A set of functions used to augment data.
     Supported languages are:
@@ -87,6 +93,8 @@ class Translate:
         >>> t = Translate(src="en",to="es")
         >>> t.augment('I love school')
         i adore school
+        >>> await t.augment_async('I love school')
+        i adore school
     """
 
     def __init__(self, **kwargs):
@@ -99,6 +107,8 @@ class Translate:
         :type to: str
         :param to: Destination language to translate to. The language should be a family of the source language for
                 better results. The text will then be translated back to the source language.
+        :type profiler: textaugment.Profiler
+        :param profiler: (optional) Records the time spent in each stage
         :rtype:   None
         :return:  Constructer do not return.
         """
@@ -119,6 +129,7 @@ class Translate:
         else:    
             self.to = kwargs['to']
             self.src = kwargs['src']
+            self.profiler = kwargs.get('profiler')
 
     def augment(self, data):
         """
@@ -133,15 +144,37 @@ class Translate:
             raise TypeError("DataType must be a string")
         data = TextBlob(data.lower())
         try:
-            data = data.translate(from_lang=self.src, to=self.to)
-            data = data.translate(from_lang=self.to, to=self.src)
+            with stage(self.profiler, 'translate'):
+                data = data.translate(from_lang=self.src, to=self.to)
+                data = data.translate(from_lang=self.to, to=self.src)
         except NotTranslated:
             try:  # Switch to googletrans to do translation.
-                translator = Translator()
-                data = translator.translate(data, dest=self.to, src=self.src).text
-                data = translator.translate(data, dest=self.src, src=self.to).text
+                with stage(self.profiler, 'translate_fallback'):
+                    if GOOGLETRANS_ASYNC:
+                        data = asyncio.run(self._googletrans(str(data)))
+                    else:
+                        translator = Translator()
+                        data = translator.translate(data, dest=self.to, src=self.src).text
+                        data = translator.translate(data, dest=self.src, src=self.to).text
             except Exception:
                 print("Error Not translated.\n")
                 raise
 
         return str(data).lower()
+
+    async def _googletrans(self, data):
+        """Translate to the destination language and back with the async googletrans client"""
+        async with Translator() as translator:
+            data = (await translator.translate(data, dest=self.to, src=self.src)).text
+            data = (await translator.translate(data, dest=self.src, src=self.to)).text
+        return data
+
+    async def _augment_async(self, data):
+        """Paraphrase with non-blocking I/O when googletrans is async, otherwise in the executor"""
+        if type(data) is not str:
+            raise TypeError("DataType must be a string")
+        if not GOOGLETRANS_ASYNC:
+            return await super()._augment_async(data)
+        with stage(self.profiler, 'translate'):
+            data = await self._googletrans(data.lower())
+        return str(data).lower()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# TextAugment: vocabulary
+#
+# Copyright (C) 2023
+# Author: Joseph Sefara
+#
+# URL: <https://github.com/dsfsi/textaugment/>
+# For license information, see LICENSE
+#
+"""
+This module interns tokens as integer ids so that augmenters compare, filter and look up ids instead of strings.
+"""
+import contextlib
+import threading
+import numpy as np
+
+
+class Vocabulary:
+    """
+    A string table mapping tokens to int32 ids, with tables and bitmaps keyed by id shared by the augmenters.
+    Ids are only meaningful within a process.
+
+    Augmenters encode and decode within a session. When the vocabulary holds more than max_size tokens it is cleared,
+    with its tables, before the next session starts and once the running sessions have ended, so that ids in use stay
+    valid and memory stays bounded in long-running processes.
+
+    Example usage: ::
+        >>> from textaugment.vocab import VOCABULARY
+        >>> with VOCABULARY.session():
+        ...     ids = VOCABULARY.encode("john is going to town".split())
+        ...     VOCABULARY.decode(ids[::-1])
+        ['town', 'to', 'going', 'is', 'john']
+    """
+
+    def __init__(self, max_size=None):
+        """A method to initialize parameters
+
+        :type max_size: int
+        :param max_size: (optional) Number of tokens above which the vocabulary is cleared. Unbounded by default
+
+        :rtype:   None
+        :return:  Constructer do not return.
+        """
+        if max_size is not None and (not isinstance(max_size, int) or max_size < 1):
+            raise TypeError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.words = []
+        self.ids = dict()
+        self._tables = dict()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)  # Notified when the last session ends
+        self._local = threading.local()  # Depth of the sessions of the thread
+        self._sessions = 0
+        self._evicting = False
+        self.generation = 0  # Incremented when the vocabulary is cleared
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.words)
+
+    def __reduce__(self):
+        if self is VOCABULARY:
+            return _default_vocabulary, ()  # The shared vocabulary is pickled by reference
+        return super().__reduce__()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ('_lock', '_idle', '_local', '_sessions', '_evicting'):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._local = threading.local()
+        self._sessions = 0
+        self._evicting = False
+
+    @contextlib.contextmanager
+    def session(self):
+        """
+        Ids encoded in a session stay valid until it ends. Sessions of the same thread nest.
+        """
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0:
+            with self._idle:
+                if self.max_size is not None and len(self.words) > self.max_size:
+                    self._evicting = True  # New sessions wait, so that the running ones end
+                while self._evicting and self._sessions > 0:
+                    self._idle.wait()
+                if self._evicting:
+                    self._clear()
+                    self._evicting = False
+                    self.evictions += 1
+                self._sessions += 1
+        self._local.depth = depth + 1
+        try:
+            yield self
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._idle:
+                    self._sessions -= 1
+                    if self._sessions == 0:
+                        self._idle.notify_all()
+
+    def intern(self, word):
+        """Return the id of the word, adding it to the table if needed"""
+        i = self.ids.get(word)
+        if i is None:
+            with self._lock:
+                i = self.ids.get(word)
+                if i is None:
+                    i = self.ids[word] = len(self.words)
+                    self.words.append(word)
+        return i
+
+    def encode(self, words):
+        """Convert a list of tokens to an int32 array of ids"""
+        get = self.ids.get
+        ids = [get(word) for word in words]
+        if None in ids:
+            ids = [self.intern(word) if i is None else i for word, i in zip(words, ids)]
+        return np.array(ids, dtype=np.int32)
+
+    def decode(self, ids):
+        """Convert an array of ids to a list of tokens"""
+        words = self.words
+        return [words[i] for i in np.asarray(ids).tolist()]
+
+    def table(self, name):
+        """Return the shared dict called name, used for tables keyed by id (e.g. synonyms). It is emptied when the
+        vocabulary is cleared."""
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables.setdefault(name, dict())
+        return table
+
+    def bitmap(self, predicate):
+        """Return a Bitmap of predicate(word) for every id"""
+        return Bitmap(self, predicate)
+
+    def clear(self):
+        """Remove all tokens and tables once the running sessions have ended. Arrays of ids encoded before are no
+        longer valid."""
+        if getattr(self._local, 'depth', 0):
+            raise RuntimeError("clear cannot be called within a session")
+        with self._idle:
+            while self._sessions > 0:
+                self._idle.wait()
+            self._clear()
+
+    def _clear(self):
+        """Remove all tokens and tables, with the lock held"""
+        self.words = []
+        self.ids = dict()
+        self._tables = dict()
+        self.generation += 1
+
+
+class Bitmap:
+    """A boolean array indexed by id, computed with predicate(word) for each id the first time it is looked up"""
+
+    def __init__(self, vocabulary, predicate):
+        self.vocabulary = vocabulary
+        self.predicate = predicate
+        self.bits = np.zeros(0, dtype=bool)
+        self.generation = vocabulary.generation
+
+    def __getstate__(self):
+        """Ids differ between processes, copies compute the bits again"""
+        state = self.__dict__.copy()
+        state['bits'] = np.zeros(0, dtype=bool)
+        return state
+
+    def __getitem__(self, ids):
+        vocabulary = self.vocabulary
+        bits = self.bits
+        if self.generation != vocabulary.generation or len(vocabulary) > bits.shape[0]:
+            with vocabulary._lock:  # Threads of the executor of augment_async share the bitmap
+                if self.generation != vocabulary.generation:  # The vocabulary was cleared
+                    self.bits = np.zeros(0, dtype=bool)
+                    self.generation = vocabulary.generation
+                size = len(vocabulary.words)
+                if size > self.bits.shape[0]:
+                    words = vocabulary.words[self.bits.shape[0]:size]
+                    new_bits = np.fromiter((bool(self.predicate(word)) for word in words), dtype=bool,
+                                           count=len(words))
+                    self.bits = np.concatenate([self.bits, new_bits])
+                bits = self.bits
+        return bits[ids]
+
+
+VOCABULARY = Vocabulary(max_size=1000000)
+
+
+def _default_vocabulary():
+    return VOCABULARY
@@ -7,11 +7,18 @@
 # For license information, see LICENSE
 
 import gensim
+import json
 import numpy as np
+import os
 import random
+from .aio import AsyncMixin
+from .profiling import stage
+from .registry import REGISTRY
+from .tokenizer import get_tokenizer
+from .vocab import VOCABULARY
 
 
-class Word2vec:
+class Word2vec(AsyncMixin):
     """
     A set of functions used to augment data.
 
@@ -36,7 +43,33 @@ class Word2vec:
                 Used in a Paper (https://www.cs.cmu.edu/~diyiy/docs/emnlp_wang_2015.pdf)
         :type p: float, optional
         :param p: The probability of success of an individual trial. (0.1<p<1.0), default is 0.5
+        :type profiler: textaugment.Profiler
+        :param profiler: (optional) Records the time spent in each stage
+        :type mmap: str, optional
+        :param mmap: Memory-map the arrays of a model loaded from a path, e.g. mmap='r'. Processes loading the same
+                model then share its pages.
+        :type quantize: str, optional
+        :param quantize: Search neighbours in a normalized copy of the vectors quantized to 'float16' or 'int8'. For a
+                model loaded from a path the copy is saved alongside the model and loaded from there next time.
+        :type rerank: int, optional
+        :param rerank: With quantize, re-rank top_n + rerank candidates with the exact vectors. By default is 0.
+        :type tokenizer: textaugment.tokenizer.Tokenizer or bool
+        :param tokenizer: (optional) Splits punctuation from words, True for the default Tokenizer, and the replaced
+                words are put back into the text with its whitespace, punctuation and casing. By default the text is
+                split on whitespace and lower cased
         """
+        self.profiler = kwargs.get('profiler')
+        self.tokenizer = get_tokenizer(kwargs.get('tokenizer'))
+        self.mmap = kwargs.get('mmap')
+        self.quantize = kwargs.get('quantize')
+        self.rerank = kwargs.get('rerank', 0)
+        self.model_path = None
+        self.search_index = None
+        if self.quantize not in (None, 'float16', 'int8'):
+            raise TypeError("quantize must be 'float16' or 'int8'")
+        if type(self.rerank) is not int or self.rerank < 0:
+            raise TypeError("rerank must be a non-negative integer")
+        self.vocabulary = VOCABULARY
 
         # Set random state
         if 'random_state' in kwargs:
@@ -83,12 +116,88 @@ class Word2vec:
             self.runs = kwargs["runs"] 
             self.model = kwargs["model"]
             self.p = kwargs["p"]
-            try:
-                if type(self.model) is str:
-                    self.model = gensim.models.Word2Vec.load(self.model)  # load word2vec or fasttext model
-            except FileNotFoundError:
-                print("Error: Model not found. Verify the path.\n")
-                raise ValueError("Error: Model not found. Verify the path.")
+            if type(self.model) is str:
+                self.model_path = self.model
+                self.model = self._load(self.model_path)
+            self._index()
+            self._load_search_index()
+
+    def _load_search_index(self):
+        """Load or build the quantized vectors used for neighbour search"""
+        if self.quantize is None:
+            return
+        if self.model_path is None:
+            self.search_index = QuantizedVectors(self.model.wv.vectors, dtype=self.quantize)
+            return
+        path = "{}.{}".format(self.model_path, self.quantize)
+        self.search_index = REGISTRY.hold(self, ('quantized', self.quantize) + self._model_key,
+                                          lambda: self._build_search_index(path))
+
+    def _build_search_index(self, path):
+        """Load the quantized copy saved next to the model, or build and save it"""
+        if QuantizedVectors.exists(path, source=self.model_path):
+            search_index = QuantizedVectors.load(path, mmap=self.mmap)
+            if search_index.data.shape[0] == len(self.model.wv):
+                return search_index
+        search_index = QuantizedVectors(self.model.wv.vectors, dtype=self.quantize)
+        try:
+            search_index.save(path, source=self.model_path)
+        except OSError:
+            pass  # e.g. read-only model directory, the copy is built again next time
+        return search_index
+
+    def _index(self):
+        """Tables keyed by word id: whether the word is in the model, and its most similar words"""
+        if self.model_path is None:
+            self._known = self.vocabulary.bitmap(self.model.wv.__contains__)
+            self._neighbour_table = dict()
+            self._neighbour_generation = self.vocabulary.generation
+            return
+        self._known = REGISTRY.hold(self, ('known',) + self._model_key,
+                                    lambda: self.vocabulary.bitmap(self.model.wv.__contains__))
+
+    def _neighbour_cache(self):
+        """Most similar words keyed by (word id, top_n), emptied when the vocabulary is cleared. Instances of a model
+        loaded from a path share them in the vocabulary, the neighbours also depend on how they are searched."""
+        if self.model_path is not None:
+            return self.vocabulary.table(('neighbours', self.quantize, self.rerank) + self._model_key)
+        if self._neighbour_generation != self.vocabulary.generation:  # The ids were cleared with the vocabulary
+            self._neighbour_table = dict()
+            self._neighbour_generation = self.vocabulary.generation
+        return self._neighbour_table
+
+    def _load(self, path):
+        """Load word2vec or fasttext model, once per process for each version of the file and mmap"""
+        try:
+            self._model_key = (os.path.abspath(path), os.stat(path).st_mtime_ns, self.mmap)
+            return REGISTRY.hold(self, ('word2vec',) + self._model_key,
+                                 lambda: gensim.models.Word2Vec.load(path, mmap=self.mmap))
+        except FileNotFoundError:
+            print("Error: Model not found. Verify the path.\n")
+            raise ValueError("Error: Model not found. Verify the path.")
+
+    def __getstate__(self):
+        """A model loaded from a path is not pickled, copies load it again from the path"""
+        state = super().__getstate__()
+        state.pop('_known', None)
+        state.pop('_neighbour_table', None)
+        if self.model_path is not None:
+            state['model'] = None
+            state['search_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.model is None:
+            self.model = self._load(self.model_path)
+            self._load_search_index()
+        self._index()
+
+    def warmup(self):
+        """Precompute the normalized vectors used by similarity search. Call before forking workers so that they
+        share the pages instead of computing them on their first call."""
+        self.model.wv.fill_norms()
+        return self
 
     def geometric(self, data):
         """
@@ -123,34 +232,227 @@ class Word2vec:
             raise TypeError("Only integers are supported")
         if type(data) is not str: 
             raise TypeError("Only strings are supported")
-        # Lower case and split
-        data_tokens = data.lower().split()
-
-        # Verbose = True then replace all the words.
-        if self.v:
-            for _ in range(self.runs):
-                for index in range(len(data_tokens)):  # Index from 0 to length of data_tokens
-                    try:
-                        similar_words = [syn for syn, t in self.model.wv.most_similar(data_tokens[index], topn=top_n)]
-                        r = random.randrange(len(similar_words))
-                        data_tokens[index] = similar_words[r].lower()  # Replace with random synonym from 10 synonyms
-                    except KeyError:
-                        pass  # For words not in the word2vec model
-        else:  # Randomly replace some words
-            for _ in range(self.runs):
-                data_tokens_idx = [[x, y] for (x, y) in enumerate(data_tokens)]  # Enumerate data
-                words = self.geometric(data=data_tokens_idx).tolist()  # List of words indexed
-                for w in words:
-                    try:
-                        similar_words_and_weights = [(syn, t) for syn, t in self.model.wv.most_similar(w[1])]
-                        similar_words = [word for word, t in similar_words_and_weights]
-                        similar_words_weights = [t for word, t in similar_words_and_weights]
-                        word = random.choices(similar_words, similar_words_weights, k=1)
-                        data_tokens[int(w[0])] = word[0].lower()  # Replace with random synonym from 10 synonyms
-                    except KeyError:
-                        pass
-            return " ".join(data_tokens)
-        return " ".join(data_tokens)
+        with stage(self.profiler, 'tokenize'):
+            tokens = data.split() if self.tokenizer is None else self.tokenizer.tokenize(data)
+        words = self._augment(tokens, top_n)
+        with stage(self.profiler, 'join'):
+            if self.tokenizer is None:
+                return " ".join(words)
+            return self.tokenizer.rebuild(tokens, words)
+
+    def _neighbours(self, word_id, top_n=10):
+        """Ids of the most similar words of the word with the given id, with the alias table of their similarities.
+        Searched once per word."""
+        table = self._neighbour_cache()
+        neighbours = table.get((word_id, top_n))
+        if neighbours is None:
+            if self.profiler is not None:
+                self.profiler.miss('neighbours')
+            with stage(self.profiler, 'embedding_search'):
+                similar = self._most_similar(self.vocabulary.words[word_id], top_n)
+            similar_ids = self.vocabulary.encode([syn.lower() for syn, t in similar])
+            prob, alias = alias_table([t for syn, t in similar])
+            neighbours = table[(word_id, top_n)] = (similar_ids, prob, alias)
+        elif self.profiler is not None:
+            self.profiler.hit('neighbours')
+        return neighbours
+
+    def _most_similar(self, word, top_n=10):
+        """Most similar words and their similarities, searched in the quantized vectors if there are"""
+        wv = self.model.wv
+        index = wv.key_to_index.get(word)
+        if self.search_index is None or index is None:  # fasttext builds vectors of unknown words from n-grams
+            return wv.most_similar(word, topn=top_n)
+        exact = None
+        if self.rerank:
+            wv.fill_norms()
+            exact = (wv.vectors, wv.norms)
+        return [(wv.index_to_key[i], score)
+                for i, score in self.search_index.most_similar(index, top_n, exact=exact, rerank=self.rerank)]
+
+    def _augment(self, tokens, top_n=10):
+        """Replace words in the list of tokens with similar words"""
+        with self.vocabulary.session():
+            # Lower case
+            ids = self.vocabulary.encode([token.lower() for token in tokens])
+            known = self._known[ids]  # Words not in the word2vec model are kept
+
+            # Verbose = True then replace all the words.
+            if self.v:
+                for _ in range(self.runs):
+                    for index in np.flatnonzero(known).tolist():
+                        similar_ids = self._neighbours(int(ids[index]), top_n)[0]
+                        if len(similar_ids):
+                            ids[index] = similar_ids[random.randrange(len(similar_ids))]  # Replace with random synonym
+                    known = self._known[ids]
+            else:  # Randomly replace some words
+                for _ in range(self.runs):
+                    selected = self.geometric(data=np.arange(len(ids)))  # Indices of selected words
+                    selected = selected[known[selected]]
+                    neighbours = [self._neighbours(int(i)) for i in ids[selected]]
+                    neighbours = [(index, n) for index, n in zip(selected.tolist(), neighbours) if len(n[0])]
+                    if neighbours:
+                        # Draw the replacements of all the selected words at once, weighted by similarity
+                        draws = alias_draw([(prob, alias) for index, (_ids, prob, alias) in neighbours])
+                        for (index, (similar_ids, _prob, _alias)), draw in zip(neighbours, draws.tolist()):
+                            ids[index] = similar_ids[draw]
+                    known = self._known[ids]
+            return self.vocabulary.decode(ids)
+
+
+def alias_table(weights):
+    """
+    Build the alias table of Vose's method, so that a weighted draw takes constant time. Negative weights (e.g.
+    negative similarities) are clipped to 0, and all weights equal to 0 give a uniform draw.
+
+    :type weights: list
+    :param weights: Weights of the outcomes
+    :rtype:   tuple
+    :return:  Probabilities (float32) and aliases (int32) of the outcomes
+    """
+    weights = np.clip(np.asarray(weights, dtype=np.float64), 0, None)
+    n = weights.shape[0]
+    total = weights.sum()
+    prob = weights * (n / total) if total > 0 else np.ones(n)
+    alias = np.arange(n, dtype=np.int32)
+    small = [i for i in range(n) if prob[i] < 1.0]
+    large = [i for i in range(n) if prob[i] >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        alias[s] = l
+        prob[l] -= 1.0 - prob[s]
+        (small if prob[l] < 1.0 else large).append(l)
+    prob[small + large] = 1.0  # Left over because of rounding
+    return prob.astype(np.float32), alias
+
+
+def alias_draw(tables):
+    """
+    Draw one outcome from each alias table, for all the tables at once.
+
+    :type tables: list
+    :param tables: List of (prob, alias) from alias_table
+    :rtype:   ndarray
+    :return:  Index of the outcome drawn from each table
+    """
+    lengths = np.array([prob.shape[0] for prob, alias in tables])
+    columns = (np.random.random_sample(len(tables)) * lengths).astype(np.intp)
+    coins = np.random.random_sample(len(tables))
+    accept = coins < np.array([prob[c] for (prob, alias), c in zip(tables, columns.tolist())])
+    aliases = np.array([alias[c] for (prob, alias), c in zip(tables, columns.tolist())], dtype=np.intp)
+    return np.where(accept, columns, aliases)
+
+
+class QuantizedVectors:
+    """
+    Normalized copy of word vectors quantized to float16, or to int8 with a scale per row, for neighbour search. It
+    takes 2 or 4 times less memory than float32 vectors.
+
+    Typical usage: ::
+        >>> from textaugment.word2vec import QuantizedVectors
+        >>> q = QuantizedVectors(model.wv.vectors, dtype='int8')
+        >>> q.most_similar(model.wv.key_to_index['school'], topn=3)
+        [(42, 0.91), (7, 0.88), (120, 0.85)]
+    """
+
+    block_size = 65536  # Rows converted to float32 at a time during the search
+
+    def __init__(self, vectors, dtype='int8'):
+        """
+        :type vectors: ndarray
+        :param vectors: Word vectors, one row per word
+        :type dtype: str
+        :param dtype: 'float16' or 'int8'
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        normed = vectors / np.where(norms > 0, norms, 1)
+        if dtype == 'float16':
+            self.data = normed.astype(np.float16)
+            self.scale = None
+        elif dtype == 'int8':
+            scale = np.abs(normed).max(axis=1) / 127
+            scale[scale == 0] = 1
+            self.data = np.rint(normed / scale[:, None]).astype(np.int8)
+            self.scale = scale.astype(np.float32)
+        else:
+            raise TypeError("dtype must be 'float16' or 'int8'")
+
+    @staticmethod
+    def fingerprint(path):
+        """Size and modification time of the file at path"""
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    @staticmethod
+    def exists(path, source=None):
+        """Whether a copy was saved at path, from the current version of the file source if it is given"""
+        if not os.path.exists(path + '.npy'):
+            return False
+        if source is None:
+            return True
+        try:
+            with open(path + '.source.json') as f:
+                return json.load(f) == QuantizedVectors.fingerprint(source)
+        except (OSError, ValueError):
+            return False
+
+    def save(self, path, source=None):
+        """Save to path.npy (and path.scale.npy for int8), and the fingerprint of the file source to
+        path.source.json"""
+        np.save(path + '.npy', self.data)
+        if self.scale is not None:
+            np.save(path + '.scale.npy', self.scale)
+        if source is not None:
+            with open(path + '.source.json', 'w') as f:
+                json.dump(self.fingerprint(source), f)
+
+    @classmethod
+    def load(cls, path, mmap=None):
+        """Load a copy saved with save, memory-mapped with mmap (e.g. 'r')"""
+        self = cls.__new__(cls)
+        self.data = np.load(path + '.npy', mmap_mode=mmap)
+        self.scale = np.load(path + '.scale.npy', mmap_mode=mmap) if self.data.dtype == np.int8 else None
+        return self
+
+    def _vector(self, index):
+        """Dequantized vector of the row index"""
+        vector = self.data[index].astype(np.float32)
+        return vector if self.scale is None else vector * self.scale[index]
+
+    def most_similar(self, index, topn=10, exact=None, rerank=0):
+        """
+        Rows most similar to the row index by cosine similarity, excluding itself.
+
+        :type index: int
+        :param index: Row of the word
+        :type topn: int
+        :param topn: Number of rows to return
+        :type exact: tuple
+        :param exact: (optional) Exact (vectors, norms) used to re-rank the candidates
+        :type rerank: int
+        :param rerank: Number of extra candidates to re-rank with exact
+        :rtype:   list
+        :return:  List of (row, similarity)
+        """
+        query = self._vector(index)
+        scores = np.empty(self.data.shape[0], dtype=np.float32)
+        for start in range(0, self.data.shape[0], self.block_size):
+            block = self.data[start:start + self.block_size].astype(np.float32)
+            scores[start:start + block.shape[0]] = block @ query
+        if self.scale is not None:
+            scores *= self.scale
+        scores[index] = -np.inf
+        k = min(topn + (rerank if exact is not None else 0), scores.shape[0] - 1)
+        if k <= 0:
+            return []
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        if exact is not None:
+            vectors, norms = exact
+            scores = np.zeros_like(scores)
+            scores[candidates] = vectors[candidates] @ vectors[index] / (norms[candidates] * norms[index])
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')][:topn]
+        return [(i, float(scores[i])) for i in candidates.tolist()]
 
 
 class Fasttext(Word2vec):
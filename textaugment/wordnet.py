@@ -7,12 +7,70 @@
 # For license information, see LICENSE
 
 import numpy as np
-import nltk
 from itertools import chain
 from nltk.corpus import wordnet
+from nltk.tag import PerceptronTagger
+from .aio import AsyncMixin
+from .profiling import stage, count_filtered
+from .vocab import VOCABULARY
+from .registry import REGISTRY
+from .tokenizer import get_tokenizer
 
 
-class Wordnet:
+class _InWordnet:
+    """True for words with a synset of the part of speech in the language. The lemma names are read once per process
+    and shared through the registry, so they survive the vocabulary being cleared."""
+
+    def __init__(self, pos=None, lang="eng"):
+        self.pos = pos
+        self.lang = lang
+        self._lemmas = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lemmas'] = None
+        return state
+
+    def load(self):
+        """Read the lemma names. Called before the bitmap is looked up, which computes bits with the vocabulary lock
+        held."""
+        if self._lemmas is None:
+            pos, lang = self.pos, self.lang
+            self._lemmas = REGISTRY.get(('lemmas', pos, lang),
+                                        lambda: frozenset(wordnet.all_lemma_names(pos=pos, lang=lang)))
+        return self
+
+    def __call__(self, word):
+        word = word.lower()
+        if word in self.load()._lemmas:
+            return True
+        # Inflected forms (e.g. going) are found through their base form in english
+        return self.lang == "eng" and wordnet.morphy(word, self.pos) is not None
+
+
+def synset_mask(vocabulary, pos=None, lang="eng"):
+    """
+    Index of the words that have a synset of the part of speech in the language, used to skip the lookup of words
+    without synonyms. It is built once per (pos, lang) and shared by the augmenters using the vocabulary.
+
+    :type vocabulary: textaugment.vocab.Vocabulary
+    :param vocabulary: Vocabulary of the word ids
+    :type pos: str
+    :param pos: (optional) Part of speech, e.g. wordnet.NOUN. None for all
+    :type lang: str
+    :param lang: (optional) Language
+    :rtype:   textaugment.vocab.Bitmap
+    :return:  Bitmap indexed by word id
+    """
+    table = vocabulary.table('synset_mask')
+    mask = table.get((pos, lang))
+    if mask is None:
+        mask = table.setdefault((pos, lang), vocabulary.bitmap(_InWordnet(pos, lang)))
+    mask.predicate.load()
+    return mask
+
+
+class Wordnet(AsyncMixin):
     """
     A set of functions used to augment data.
 
@@ -41,6 +99,12 @@ class Wordnet:
         :param runs: Number of repetition on single text
         :type p: float, optional
         :param p: The probability of success of an individual trial. (0.1<p<1.0), default is 0.5
+        :type profiler: textaugment.Profiler
+        :param profiler: (optional) Records the time spent in each stage
+        :type tokenizer: textaugment.tokenizer.Tokenizer or bool
+        :param tokenizer: (optional) Splits punctuation from words, True for the default Tokenizer, and the replaced
+                words are put back into the text with its whitespace, punctuation and casing. By default the text is
+                split on whitespace and lower cased
         :rtype:   None
         :return:  Constructer do not return.
         """
@@ -85,6 +149,29 @@ class Wordnet:
         self.v = kwargs['v']
         self.n = kwargs['n']
         self.runs = kwargs['runs']
+        self.profiler = kwargs.get('profiler')
+        self.tokenizer = get_tokenizer(kwargs.get('tokenizer'))
+        self.vocabulary = VOCABULARY
+
+    def warmup(self, lang="eng"):
+        """
+        Load WordNet and the POS tagger now instead of on the first call. Call before forking workers so that they
+        share them.
+
+        :type lang: str
+        :param lang: Language of the synonyms to load
+        :rtype:   Wordnet
+        :return:  The augmenter
+        """
+        wordnet.ensure_loaded()
+        if lang != "eng":
+            wordnet.synsets("warmup", lang=lang)  # Loads the Open Multilingual Wordnet data of the language
+        self._tagger()
+        return self
+
+    def _tagger(self):
+        """The POS tagger, loaded once per process and shared by the Wordnet instances"""
+        return REGISTRY.hold(self, ('tagger', 'eng'), PerceptronTagger)
 
     def geometric(self, data):
         """
@@ -116,45 +203,56 @@ class Wordnet:
         :rtype:   str
         :return:  The augmented data
         """
-        data = data.lower().split()
-        data_tokens = [[i, x, y] for i, (x, y) in enumerate(nltk.pos_tag(data))]  # Convert tuple to list
-        if self.v:
-            for loop in range(self.runs):
-                words = [[i, x] for i, x, y in data_tokens if y[0] == 'V']
-                words = [i for i in self.geometric(data=words)]  # List of selected words
-                if len(words) >= 1:  # There are synonyms
-                    for word in words:
-                        synonyms1 = wordnet.synsets(word[1], wordnet.VERB, lang=lang)  # Return verbs only
-                        synonyms = list(set(chain.from_iterable([syn.lemma_names(lang=lang) for syn in synonyms1])))
-                        synonyms_ = []  # Synonyms with no underscores goes here
-                        for w in synonyms:
-                            if '_' not in w:
-                                synonyms_.append(w)  # Remove words with underscores
-                        if len(synonyms_) >= 1:
-                            synonyms_ = synonyms_[:top_n if top_n else len(synonyms_)]  # use top n or all synonyms
-                            synonym = self.geometric(data=synonyms_).tolist()
-                            if synonym:  # There is a synonym
-                                data[int(word[0])] = synonym[0].lower()  # Take the first success
-
-        if self.n:
-            for loop in range(self.runs):
-                words = [[i, x] for i, x, y in data_tokens if y[0] == 'N']
-                words = [i for i in self.geometric(data=words)]  # List of selected words
-                if len(words) >= 1:  # There are synonyms
-                    for word in words:
-                        synonyms1 = wordnet.synsets(word[1], wordnet.NOUN, lang=lang)  # Return nouns only
-                        synonyms = list(set(chain.from_iterable([syn.lemma_names(lang=lang) for syn in synonyms1])))
-                        synonyms_ = []  # Synonyms with no underscores goes here
-                        for w in synonyms:
-                            if '_' not in w:
-                                synonyms_.append(w)  # Remove words with underscores
+        with stage(self.profiler, 'tokenize'):
+            tokens = data.split() if self.tokenizer is None else self.tokenizer.tokenize(data)
+        words = self._replace(tokens, lang, top_n)
+        with stage(self.profiler, 'join'):
+            if self.tokenizer is None:
+                return " ".join(words)
+            return self.tokenizer.rebuild(tokens, words)
+
+    def _synonyms(self, word_id, pos, lang):
+        """Sorted synonyms with no underscores of the word with the given id, looked up in wordnet once per word"""
+        table = self.vocabulary.table(('wordnet', pos, lang))
+        synonyms = table.get(word_id)
+        if synonyms is None:
+            if self.profiler is not None:
+                self.profiler.miss('synonyms')
+            with stage(self.profiler, 'wordnet_lookup'):
+                synonyms1 = wordnet.synsets(self.vocabulary.words[word_id], pos, lang=lang)
+                synonyms = sorted(set(chain.from_iterable([syn.lemma_names(lang=lang) for syn in synonyms1])))
+            synonyms = table[word_id] = tuple(w for w in synonyms if '_' not in w)  # Remove words with underscores
+        elif self.profiler is not None:
+            self.profiler.hit('synonyms')
+        return synonyms
+
+    def _replace(self, words, lang="eng", top_n=10):
+        """Replace words in the list of words with synonyms"""
+        with self.vocabulary.session():
+            data = [word.lower() for word in words]
+            with stage(self.profiler, 'pos_tag'):
+                # Tokenizers keep the casing, which the tagger uses (e.g. for proper nouns). Only lookups are lowercase
+                tagged = data if self.tokenizer is None else list(words)
+                tags = [tag[0] for word, tag in self._tagger().tag(tagged)]
+            word_ids = self.vocabulary.encode(data)
+            ids = word_ids.copy()
+            for replace, tag, pos in ((self.v, 'V', wordnet.VERB), (self.n, 'N', wordnet.NOUN)):
+                if not replace:
+                    continue
+                indices = np.array([i for i, t in enumerate(tags) if t == tag], dtype=np.intp)
+                has_synset = synset_mask(self.vocabulary, pos, lang)[word_ids]
+                for loop in range(self.runs):
+                    selected = self.geometric(data=indices)  # Indices of selected words
+                    count_filtered(self.profiler, 'synset_index', has_synset[selected])
+                    for index in selected[has_synset[selected]].tolist():  # Words without synsets have no synonyms
+                        synonyms_ = self._synonyms(int(word_ids[index]), pos, lang)
                         if len(synonyms_) >= 1:
                             synonyms_ = synonyms_[:top_n if top_n else len(synonyms_)]  # use top n or all synonyms
                             synonym = self.geometric(data=synonyms_).tolist()
                             if synonym:  # There is a synonym
-                                data[int(word[0])] = synonym[0].lower()  # Take the first success
+                                ids[index] = self.vocabulary.intern(synonym[0].lower())  # Take the first success
 
-        return " ".join(data)
+            return self.vocabulary.decode(ids)
 
     def augment(self, data, lang="eng", top_n=10):
         """
@@ -181,4 +279,8 @@ class Wordnet:
             raise TypeError("Only integers are supported")
 
         data = self.replace(data, lang, top_n)
-        return data 
+        return data
+
+    def _augment(self, words, lang="eng", top_n=10):
+        """Augment a list of words, used by Pipeline"""
+        return self._replace(words, lang, top_n) 